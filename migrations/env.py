@@ -14,7 +14,13 @@ from src.config.settings import Config
 # access to the values within the .ini file in use.
 config = context.config
 
-config.set_main_option("sqlalchemy.url", Config.DATABASE_URL)
+# `alembic -x shard=<name> upgrade head` migrates one of SHARD_DATABASE_URLS
+shard = context.get_x_argument(as_dictionary=True).get("shard")
+
+config.set_main_option(
+    "sqlalchemy.url",
+    {"default": Config.DATABASE_URL, **Config.SHARD_DATABASE_URLS}[shard or "default"],
+)
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
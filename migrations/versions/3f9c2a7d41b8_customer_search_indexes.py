@@ -0,0 +1,69 @@
+"""customer search indexes
+
+Revision ID: 3f9c2a7d41b8
+Revises: 758bbbbaa55a
+Create Date: 2026-10-19 09:12:44.106204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a7d41b8'
+down_revision: Union[str, None] = '758bbbbaa55a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRGM_COLUMNS = ['first_name', 'last_name', 'email']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # build the indexes without blocking writes on large customer tables
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_customers_business_id',
+            'customers',
+            ['business_id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        for column in TRGM_COLUMNS:
+            op.create_index(
+                f'ix_customers_{column}_trgm',
+                'customers',
+                [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_customers_phone_digits_trgm "
+            "ON customers USING gin (regexp_replace(phone, '\\D', '', 'g') gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_customers_phone_digits_trgm')
+        for column in reversed(TRGM_COLUMNS):
+            op.drop_index(
+                f'ix_customers_{column}_trgm',
+                table_name='customers',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+        op.drop_index(
+            'ix_customers_business_id',
+            table_name='customers',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,33 @@
+"""auth meta data user id
+
+Revision ID: 5c7d1e9b2f40
+Revises: a81e5c0f9d23
+Create Date: 2026-10-19 13:41:08.227914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c7d1e9b2f40'
+down_revision: Union[str, None] = 'a81e5c0f9d23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('auth_meta_data', sa.Column('user_id', sa.Uuid(), nullable=True))
+    op.create_index(op.f('ix_auth_meta_data_user_id'), 'auth_meta_data', ['user_id'], unique=False)
+    op.create_foreign_key('auth_meta_data_user_id_fkey', 'auth_meta_data', 'users', ['user_id'], ['uid'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('auth_meta_data_user_id_fkey', 'auth_meta_data', type_='foreignkey')
+    op.drop_index(op.f('ix_auth_meta_data_user_id'), table_name='auth_meta_data')
+    op.drop_column('auth_meta_data', 'user_id')
@@ -0,0 +1,96 @@
+"""ledger
+
+Revision ID: a81e5c0f9d23
+Revises: 3f9c2a7d41b8
+Create Date: 2026-10-19 11:03:27.518730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'a81e5c0f9d23'
+down_revision: Union[str, None] = '3f9c2a7d41b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+IMMUTABLE_TABLES = ['journal_entries', 'ledger_postings']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('ledger_accounts',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('business_id', sa.Uuid(), nullable=False),
+    sa.Column('code', sa.VARCHAR(), nullable=False),
+    sa.Column('created_at', postgresql.TIMESTAMP(), nullable=True),
+    sa.ForeignKeyConstraint(['business_id'], ['businesses.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('business_id', 'code')
+    )
+    op.create_table('journal_entries',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('business_id', sa.Uuid(), nullable=False),
+    sa.Column('transaction_id', sa.Uuid(), nullable=True),
+    sa.Column('description', sa.VARCHAR(), nullable=True),
+    sa.Column('created_at', postgresql.TIMESTAMP(), nullable=False),
+    sa.ForeignKeyConstraint(['business_id'], ['businesses.id'], ),
+    sa.ForeignKeyConstraint(['transaction_id'], ['transactions.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_journal_entries_transaction_id'), 'journal_entries', ['transaction_id'], unique=False)
+    op.create_table('ledger_postings',
+    sa.Column('id', sa.BIGINT(), autoincrement=True, nullable=False),
+    sa.Column('entry_id', sa.Uuid(), nullable=False),
+    sa.Column('account_id', sa.Uuid(), nullable=False),
+    sa.Column('amount', postgresql.NUMERIC(precision=20, scale=4), nullable=False),
+    sa.Column('created_at', postgresql.TIMESTAMP(), nullable=False),
+    sa.ForeignKeyConstraint(['account_id'], ['ledger_accounts.id'], ),
+    sa.ForeignKeyConstraint(['entry_id'], ['journal_entries.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_ledger_postings_account_created', 'ledger_postings', ['account_id', 'created_at'], unique=False)
+    op.create_table('ledger_balance_snapshots',
+    sa.Column('id', sa.BIGINT(), autoincrement=True, nullable=False),
+    sa.Column('account_id', sa.Uuid(), nullable=False),
+    sa.Column('balance', postgresql.NUMERIC(precision=20, scale=4), nullable=False),
+    sa.Column('as_of', postgresql.TIMESTAMP(), nullable=False),
+    sa.Column('created_at', postgresql.TIMESTAMP(), nullable=True),
+    sa.ForeignKeyConstraint(['account_id'], ['ledger_accounts.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_ledger_balance_snapshots_account_as_of', 'ledger_balance_snapshots', ['account_id', 'as_of'], unique=False)
+
+    # journal rows are append-only; corrections are posted as new entries
+    op.execute(
+        """
+        CREATE FUNCTION ledger_reject_mutation() RETURNS trigger AS $$
+        BEGIN
+            RAISE EXCEPTION '% is append-only', TG_TABLE_NAME;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in IMMUTABLE_TABLES:
+        op.execute(
+            f"CREATE TRIGGER {table}_immutable BEFORE UPDATE OR DELETE ON {table} "
+            "FOR EACH ROW EXECUTE FUNCTION ledger_reject_mutation()"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in IMMUTABLE_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_immutable ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS ledger_reject_mutation()")
+    op.drop_index('ix_ledger_balance_snapshots_account_as_of', table_name='ledger_balance_snapshots')
+    op.drop_table('ledger_balance_snapshots')
+    op.drop_index('ix_ledger_postings_account_created', table_name='ledger_postings')
+    op.drop_table('ledger_postings')
+    op.drop_index(op.f('ix_journal_entries_transaction_id'), table_name='journal_entries')
+    op.drop_table('journal_entries')
+    op.drop_table('ledger_accounts')
@@ -0,0 +1,45 @@
+"""login events
+
+Revision ID: b2e84f6a0c17
+Revises: 5c7d1e9b2f40
+Create Date: 2026-10-19 14:22:51.603187
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2e84f6a0c17'
+down_revision: Union[str, None] = '5c7d1e9b2f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('login_events',
+    sa.Column('id', sa.BIGINT(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.Uuid(), nullable=True),
+    sa.Column('session_id', sa.Uuid(), nullable=True),
+    sa.Column('event', sa.VARCHAR(), nullable=False),
+    sa.Column('email', sa.VARCHAR(), nullable=True),
+    sa.Column('device_ip', sa.VARCHAR(), nullable=True),
+    sa.Column('device_name', sa.VARCHAR(), nullable=True),
+    sa.Column('device_os', sa.VARCHAR(), nullable=True),
+    sa.Column('device_browser', sa.VARCHAR(), nullable=True),
+    sa.Column('timezone', sa.VARCHAR(), nullable=True),
+    sa.Column('user_agent', sa.VARCHAR(), nullable=True),
+    sa.Column('created_at', postgresql.TIMESTAMP(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_login_events_user_created', 'login_events', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_login_events_user_created', table_name='login_events')
+    op.drop_table('login_events')
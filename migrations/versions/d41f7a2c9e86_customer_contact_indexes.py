@@ -0,0 +1,41 @@
+"""customer contact indexes
+
+Revision ID: d41f7a2c9e86
+Revises: b2e84f6a0c17
+Create Date: 2026-10-19 16:05:12.418230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41f7a2c9e86'
+down_revision: Union[str, None] = 'b2e84f6a0c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # the import duplicate check compares normalised contacts, so index the
+    # same expressions it filters on
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_customers_business_email_lower "
+            "ON customers (business_id, lower(email))"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_customers_business_phone_digits "
+            "ON customers (business_id, regexp_replace(phone, '\\D', '', 'g'))"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_customers_business_phone_digits')
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_customers_business_email_lower')
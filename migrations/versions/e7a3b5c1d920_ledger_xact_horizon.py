@@ -0,0 +1,53 @@
+"""ledger xact horizon
+
+Revision ID: e7a3b5c1d920
+Revises: d41f7a2c9e86
+Create Date: 2026-10-19 17:40:03.271954
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3b5c1d920'
+down_revision: Union[str, None] = 'd41f7a2c9e86'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # existing postings are all committed, so they get the lowest id and are
+    # covered by the first horizon; a constant default adds the column
+    # without rewriting the table or firing the append-only trigger
+    op.execute(
+        "ALTER TABLE ledger_postings ADD COLUMN xact_id xid8 NOT NULL DEFAULT '1'"
+    )
+    op.execute(
+        "ALTER TABLE ledger_postings "
+        "ALTER COLUMN xact_id SET DEFAULT pg_current_xact_id()"
+    )
+    op.create_index(
+        'ix_ledger_postings_account_xact',
+        'ledger_postings',
+        ['account_id', 'xact_id'],
+        unique=False,
+    )
+
+    # snapshots are derived from postings; the old ones were cut by time and
+    # cannot be given a horizon, so the snapshotter rebuilds them
+    op.execute('DELETE FROM ledger_balance_snapshots')
+    op.execute(
+        'ALTER TABLE ledger_balance_snapshots ADD COLUMN xact_horizon xid8 NOT NULL'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('ledger_balance_snapshots', 'xact_horizon')
+    op.drop_index('ix_ledger_postings_account_xact', table_name='ledger_postings')
+    op.drop_column('ledger_postings', 'xact_id')
@@ -0,0 +1,80 @@
+"""Seed a business with synthetic customers and time search autocomplete.
+
+Usage: python -m scripts.bench_customer_search [--customers 1000000] [--runs 200]
+
+Runs against DATABASE_URL, so point it at a scratch database with the
+customer search migration applied.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import string
+import time
+import uuid
+
+from sqlalchemy import text
+
+from src.config.db import async_session
+from src.modules.customers.service import CustomerService
+
+SEED_SQL = """
+INSERT INTO customers (id, business_id, first_name, last_name, email, phone,
+                       payment_frequency, created_at, update_at)
+SELECT gen_random_uuid(), :business_id,
+       'first' || md5(g::text), 'last' || md5((g * 7)::text),
+       'user' || g || '@example.com', '+234 ' || (8000000000 + g)::text,
+       'monthly', now(), now()
+FROM generate_series(1, :count) AS g
+"""
+
+
+async def seed(business_id: uuid.UUID, count: int):
+    async with async_session() as session:
+        await session.execute(
+            text(
+                "INSERT INTO businesses (id, business_name, business_phone, business_kyc_status) "
+                "VALUES (:id, 'search benchmark', '0', 'approved')"
+            ),
+            {"id": business_id},
+        )
+        await session.execute(text(SEED_SQL), {"business_id": business_id, "count": count})
+        await session.commit()
+        await session.execute(text("ANALYZE customers"))
+
+
+async def bench(business_id: uuid.UUID, runs: int):
+    service = CustomerService()
+    terms = [
+        random.choice(["first", "last", "user", "800"])
+        + "".join(random.choices(string.hexdigits.lower()[:16], k=random.randint(1, 4)))
+        for _ in range(runs)
+    ]
+    timings = []
+
+    async with async_session() as session:
+        for term in terms:
+            started = time.perf_counter()
+            await service.search_customers(business_id, term, 10, None, session)
+            timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    print(
+        f"runs={runs} p50={statistics.median(timings):.2f}ms "
+        f"p95={timings[int(runs * 0.95) - 1]:.2f}ms max={timings[-1]:.2f}ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--customers", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    business_id = uuid.uuid4()
+    await seed(business_id, args.customers)
+    await bench(business_id, args.runs)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
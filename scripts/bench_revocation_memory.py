@@ -0,0 +1,71 @@
+"""Compare redis memory per revoked token, old string keys vs hour buckets.
+
+Usage: python -m scripts.bench_revocation_memory [--tokens 100000] [--redis-url redis://localhost:6379/15]
+
+Point it at a scratch redis database: the keys it writes are removed
+afterwards, but the used_memory readings include anything else going on.
+The bucketed run sets per-field expiry only on Redis 7.4+, see
+supports_field_ttl.
+"""
+import argparse
+import time
+import uuid
+
+import redis
+
+from src.config.redis import RedisService, revocation_bucket
+
+LEGACY_EXPIRY = 3600
+
+
+def used_memory(store: redis.Redis) -> int:
+    return store.info("memory")["used_memory"]
+
+
+def measure(store: redis.Redis, label: str, tokens: int, write) -> float:
+    before = used_memory(store)
+    keys = write()
+    per_token = (used_memory(store) - before) / tokens
+
+    print(f"{label}: {per_token:.1f} bytes per token across {len(keys)} keys")
+
+    store.delete(*keys)
+    return per_token
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=100_000)
+    parser.add_argument("--redis-url", default="redis://localhost:6379/15")
+    args = parser.parse_args()
+
+    store = redis.Redis.from_url(args.redis_url)
+    service = RedisService(store=store)
+    now = int(time.time())
+    # access, refresh and temp tokens spread over their real lifetimes
+    lifetimes = [86400, 2 * 86400, 600]
+    tokens = [
+        (str(uuid.uuid4()), now + lifetimes[i % len(lifetimes)] - i % 3600)
+        for i in range(args.tokens)
+    ]
+
+    def write_legacy():
+        pipe = store.pipeline(transaction=False)
+        for jti, _ in tokens:
+            pipe.set(name=jti, value="", ex=LEGACY_EXPIRY)
+        pipe.execute()
+        return [jti for jti, _ in tokens]
+
+    def write_buckets():
+        for jti, exp in tokens:
+            service.add_jti_to_block_list(jti, exp)
+        return list({revocation_bucket(exp) for _, exp in tokens})
+
+    legacy = measure(store, "string keys", args.tokens, write_legacy)
+    buckets = measure(store, "hour buckets", args.tokens, write_buckets)
+
+    print(f"saving: {legacy - buckets:.1f} bytes per token ({1 - buckets / legacy:.0%})")
+
+
+if __name__ == "__main__":
+    main()
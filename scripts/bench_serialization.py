@@ -0,0 +1,66 @@
+"""Compare response serialization on the /auth/me and error paths.
+
+Usage: python -m scripts.bench_serialization [--runs 20000]
+
+The "before" numbers reproduce what FastAPI did for these routes:
+jsonable_encoder followed by a stdlib JSONResponse. For errors, the same
+constant dict was re-encoded on every raise.
+"""
+import argparse
+import timeit
+import uuid
+from datetime import datetime
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from src.common.responses import FastJSONResponse, PreEncodedJSONResponse, dumps
+from src.common.utilities import response
+from src.models import User
+
+ERROR_DETAIL = {
+    "status": False,
+    "code": 401,
+    "message": "Token is invalid Or expired",
+    "data": None,
+}
+
+
+def make_user() -> User:
+    return User(
+        uid=uuid.uuid4(),
+        business_id=str(uuid.uuid4()),
+        email="johndoe@mail.com",
+        phone="+2348000000000",
+        first_name="John",
+        last_name="Doe",
+        permissions=["customers:read", "customers:write", "transactions:read"],
+        created_at=datetime.now(),
+        update_at=datetime.now(),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20000)
+    args = parser.parse_args()
+
+    payload = response(data=make_user())
+    error_body = dumps(ERROR_DETAIL)
+
+    cases = {
+        "/auth/me before": lambda: JSONResponse(jsonable_encoder(payload)),
+        "/auth/me after": lambda: FastJSONResponse(payload),
+        "error before": lambda: JSONResponse(content=ERROR_DETAIL, status_code=401),
+        "error after": lambda: PreEncodedJSONResponse(
+            content=error_body, status_code=401
+        ),
+    }
+
+    for name, case in cases.items():
+        seconds = min(timeit.repeat(case, number=args.runs, repeat=5))
+        print(f"{name:<18} {seconds / args.runs * 1e6:8.2f} us/response")
+
+
+if __name__ == "__main__":
+    main()
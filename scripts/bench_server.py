@@ -0,0 +1,175 @@
+"""Compare throughput and memory of a bare uvicorn process and src.server.
+
+Usage: python -m scripts.bench_server [--connections 64] [--duration 15] [--path /health/live]
+
+Each setup is started in turn on a free port, loaded with keep-alive
+connections for the duration, then measured for resident memory across the
+whole process tree and stopped. src.server takes its SERVER_* settings from
+the environment as usual, e.g. SERVER_PRELOAD=true.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+SETUPS = {
+    "uvicorn": [sys.executable, "-m", "uvicorn", "src:app", "--port", "{port}"],
+    "src.server": [sys.executable, "-m", "src.server"],
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def tree_rss_kb(pid: int) -> int:
+    """Resident memory of a process and all its descendants, from /proc."""
+    total = 0
+    pending = [pid]
+
+    while pending:
+        current = pending.pop()
+
+        try:
+            with open(f"/proc/{current}/status") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1])
+
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as children:
+                    pending.extend(int(child) for child in children.read().split())
+        except FileNotFoundError:
+            continue
+
+    return total
+
+
+async def fetch(reader, writer, request: bytes) -> int:
+    writer.write(request)
+    await writer.drain()
+
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = 0
+
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":", 1)[1])
+
+    await reader.readexactly(length)
+
+    return status
+
+
+async def wait_ready(port: int, path: str, timeout: float = 60):
+    request = f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode()
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            status = await fetch(reader, writer, request)
+            writer.close()
+
+            if status == 200:
+                return
+        except (OSError, asyncio.IncompleteReadError):
+            pass
+
+        await asyncio.sleep(0.5)
+
+    raise SystemExit(f"server on port {port} did not become ready")
+
+
+async def load(port: int, path: str, connections: int, duration: float):
+    request = f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode()
+    latencies: list = []
+    errors = 0
+    deadline = time.monotonic() + duration
+
+    async def client():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                status = await fetch(reader, writer, request)
+            except (OSError, asyncio.IncompleteReadError):
+                # recycled worker closed the connection, reconnect
+                errors += 1
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                continue
+
+            if status != 200:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+        writer.close()
+
+    await asyncio.gather(*[client() for _ in range(connections)])
+
+    return latencies, errors
+
+
+def run(name: str, command: list, args) -> dict:
+    port = free_port()
+    env = {**os.environ, "SERVER_PORT": str(port)}
+    process = subprocess.Popen(
+        [part.format(port=port) for part in command],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    try:
+        asyncio.run(wait_ready(port, args.path))
+        idle_rss = tree_rss_kb(process.pid)
+        latencies, errors = asyncio.run(
+            load(port, args.path, args.connections, args.duration)
+        )
+        loaded_rss = tree_rss_kb(process.pid)
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=60)
+
+    latencies.sort()
+
+    return {
+        "setup": name,
+        "rps": len(latencies) / args.duration,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": errors,
+        "idle_rss_mb": idle_rss / 1024,
+        "loaded_rss_mb": loaded_rss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--path", default="/health/live")
+    args = parser.parse_args()
+
+    for name, command in SETUPS.items():
+        result = run(name, command, args)
+        print(
+            f"{result['setup']:<12} rps={result['rps']:.0f} "
+            f"p50={result['p50_ms']:.2f}ms p99={result['p99_ms']:.2f}ms "
+            f"errors={result['errors']} rss idle={result['idle_rss_mb']:.0f}MB "
+            f"loaded={result['loaded_rss_mb']:.0f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
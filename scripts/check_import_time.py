@@ -0,0 +1,51 @@
+"""Fail when importing the app takes longer than a budget.
+
+Usage: python -m scripts.check_import_time [--budget-ms 800] [--top 15]
+
+Runs ``python -X importtime -c "import src"`` in a fresh interpreter, then
+prints the slowest modules and the total cumulative import time of ``src``.
+"""
+import argparse
+import subprocess
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=float, default=800)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src"],
+        capture_output=True,
+        text=True,
+    )
+
+    if result.returncode != 0:
+        print(result.stderr, file=sys.stderr)
+        sys.exit(result.returncode)
+
+    modules = []
+
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        modules.append((int(cumulative_us), int(self_us), name.rstrip()))
+
+    total_ms = next(c for c, _, name in modules if name.strip() == "src") / 1000
+
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative, own, name in sorted(modules, reverse=True)[: args.top]:
+        print(f"{cumulative / 1000:14.1f} {own / 1000:9.1f}  {name}")
+
+    print(f"\nimport src: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    if total_ms > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
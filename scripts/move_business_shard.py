@@ -0,0 +1,239 @@
+"""Move one business's rows to another shard.
+
+Usage: python -m scripts.move_business_shard <business_id> --to <shard> [--purge-source]
+
+The business is marked as moving, so its requests answer 503 while the rows
+are copied. The tool waits for workers to see that, then takes the business's
+fence lock on the source shard. Sessions opened before the move (import jobs,
+slow requests) take that lock in shared mode on commit and re-check the shard
+map, so their writes either finish before the copy or fail afterwards. The
+rows are copied in one transaction on the target, the row counts are checked
+and the shard map is pointed at the target before the fence is released. The
+target must already be migrated (`alembic -x shard=<shard> upgrade head`).
+
+Reference rows (the business and its users) are upserted, so a target that
+holds copies from an earlier move gets current values.
+
+Balance snapshots are not copied: their transaction id horizons only mean
+something on the database that took them, so the target's snapshotter
+rebuilds them from the copied postings.
+
+--purge-source deletes the copied rows from the old shard afterwards, once
+the source counts still match what was copied. The ledger tables refuse
+deletes through triggers, so purging needs a role that may set
+session_replication_role.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import SQLModel
+
+import src.models  # registers the tables on SQLModel.metadata
+from src.config.settings import Config
+from src.config.shards import (
+    DEFAULT_SHARD,
+    MOVING,
+    REFERENCE_TABLES,
+    SHARDED_TABLES,
+    fence_key,
+    shard_router,
+)
+
+# serial ids and transaction ids are local to each database; nothing
+# references these columns, so the target fills them in on insert
+LOCAL_COLUMNS = {"ledger_postings": {"id", "xact_id"}}
+
+# rebuilt from the copied rows on the target, only purged from the source
+DERIVED_TABLES = {"ledger_balance_snapshots"}
+
+
+async def copy_table(
+    source,
+    target,
+    name: str,
+    where: str,
+    params: dict,
+    chunk_size: int,
+    upsert: bool,
+) -> int:
+    table = SQLModel.metadata.tables[name]
+    statement = select(table).where(text(where))
+
+    local = LOCAL_COLUMNS.get(name, set())
+
+    if local:
+        statement = statement.order_by(table.c.id)
+
+    copied = 0
+    result = await source.stream(
+        statement.execution_options(yield_per=chunk_size), params
+    )
+
+    async for rows in result.partitions(chunk_size):
+        values = [dict(row._mapping) for row in rows]
+
+        for value in values:
+            for column in local:
+                del value[column]
+
+        insert = pg_insert(table).values(values)
+        if upsert:
+            keys = [column.name for column in table.primary_key]
+            insert = insert.on_conflict_do_update(
+                index_elements=keys,
+                set_={
+                    column.name: insert.excluded[column.name]
+                    for column in table.columns
+                    if column.name not in keys
+                },
+            )
+
+        await target.execute(insert)
+        copied += len(values)
+
+    return copied
+
+
+async def count_rows(session, name: str, where: str, params: dict) -> int:
+    table = SQLModel.metadata.tables[name]
+    result = await session.execute(
+        select(func.count()).select_from(table).where(text(where)), params
+    )
+    return result.scalar_one()
+
+
+async def move(
+    business_id: uuid.UUID,
+    target_shard: str,
+    chunk_size: int,
+    settle: float,
+    purge: bool,
+):
+    if target_shard not in shard_router.urls:
+        raise SystemExit(f"unknown shard {target_shard!r}, known: {shard_router.shards}")
+
+    await shard_router.refresh()
+    source_shard = shard_router.directory.get(str(business_id), DEFAULT_SHARD)
+
+    if source_shard == MOVING:
+        raise SystemExit("business is already being moved, fix the shard map by hand")
+
+    if source_shard == target_shard:
+        raise SystemExit(f"business already lives on {target_shard!r}")
+
+    params = {"business_id": business_id, "business_key": str(business_id)}
+    source_sessions = shard_router.get_sessionmaker(source_shard)
+    target_sessions = shard_router.get_sessionmaker(target_shard)
+
+    await shard_router.set_shard(business_id, MOVING)
+    print(f"marked moving, waiting {settle}s for workers to pick it up")
+    await asyncio.sleep(settle)
+
+    fence_params = {"key": fence_key(business_id)}
+    copied_rows = {}
+
+    # held until the shard map points at the target; waits for commits that
+    # are already under way, and any later commit on the source fails
+    async with shard_router.get_engine(source_shard).connect() as fence:
+        await fence.execute(text("SELECT pg_advisory_lock(:key)"), fence_params)
+        started = time.perf_counter()
+
+        try:
+            async with source_sessions() as source, target_sessions() as target:
+                for name, where in REFERENCE_TABLES:
+                    await copy_table(
+                        source, target, name, where, params, chunk_size, True
+                    )
+
+                for name, where in SHARDED_TABLES:
+                    if name in DERIVED_TABLES:
+                        continue
+
+                    copied = await copy_table(
+                        source, target, name, where, params, chunk_size, False
+                    )
+                    expected = await count_rows(source, name, where, params)
+                    landed = await count_rows(target, name, where, params)
+
+                    if not copied == expected == landed:
+                        raise RuntimeError(
+                            f"{name}: copied {copied}, source has {expected}, "
+                            f"target has {landed}"
+                        )
+
+                    copied_rows[name] = copied
+                    print(f"{name}: {copied} rows")
+
+                await target.commit()
+        except BaseException:
+            await shard_router.set_shard(business_id, source_shard)
+            raise
+        else:
+            await shard_router.set_shard(business_id, target_shard)
+        finally:
+            await fence.execute(text("SELECT pg_advisory_unlock(:key)"), fence_params)
+
+    print(
+        f"moved {business_id} from {source_shard!r} to {target_shard!r} "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+    if purge:
+        async with source_sessions() as source:
+            # anything written to the source after the copy would be lost
+            for name, where in SHARDED_TABLES:
+                if name in DERIVED_TABLES:
+                    continue
+
+                remaining = await count_rows(source, name, where, params)
+
+                if remaining != copied_rows[name]:
+                    raise SystemExit(
+                        f"{name}: source has {remaining} rows but {copied_rows[name]} "
+                        "were copied, not purging"
+                    )
+
+            await source.execute(text("SET LOCAL session_replication_role = replica"))
+
+            for name, where in reversed(SHARDED_TABLES):
+                table = SQLModel.metadata.tables[name]
+                await source.execute(table.delete().where(text(where)), params)
+
+            await source.commit()
+
+        print(f"purged {business_id} from {source_shard!r}")
+
+    await shard_router.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("business_id", type=uuid.UUID)
+    parser.add_argument("--to", required=True, dest="target_shard")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=Config.SHARD_MAP_POLL_INTERVAL * 2,
+        help="seconds to wait after marking the business as moving",
+    )
+    parser.add_argument("--purge-source", action="store_true")
+    args = parser.parse_args()
+
+    asyncio.run(
+        move(
+            args.business_id,
+            args.target_shard,
+            args.chunk_size,
+            args.settle,
+            args.purge_source,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Run every retention policy once and print the rows removed.
+
+Usage: python -m scripts.sweep [--batch-size 1000] [--max-rows-per-second 5000]
+
+Ignores the worker lock, so avoid running it while a sweep is in progress.
+"""
+import argparse
+import asyncio
+
+from src.config.settings import Config
+from src.modules.maintenance.service import RETENTION_POLICIES, SweeperService
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=Config.SWEEP_BATCH_SIZE)
+    parser.add_argument(
+        "--max-rows-per-second", type=int, default=Config.SWEEP_MAX_ROWS_PER_SECOND
+    )
+    args = parser.parse_args()
+
+    sweeper = SweeperService(
+        RETENTION_POLICIES,
+        batch_size=args.batch_size,
+        batch_sleep=Config.SWEEP_BATCH_SLEEP,
+        max_rows_per_second=args.max_rows_per_second,
+    )
+
+    for policy, deleted in (await sweeper.run_once()).items():
+        print(f"{policy}: {deleted} rows")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,33 +1,108 @@
+import logging
 from fastapi import Depends, FastAPI, status
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from src.common.responses import FastJSONResponse
 from fastapi.staticfiles import StaticFiles
+from src.common.metrics import metrics_response, monitor_event_loop_lag
 from src.common.schema import BaseResponseModel
+from src.common.tracing import setup_tracing
 from src.common.utilities import response
 from src.modules.auth.routes import auth_router
 from src.modules.admin.routes import admin_router
+from src.modules.transactions.routes import transaction_router
+from src.modules.customers.routes import customer_router
+from src.modules.ledger.routes import ledger_router
+from src.modules.health.routes import health_router
+from src.modules.ledger.service import ledger_service
+from src.modules.maintenance.service import sweeper_service
+from src.modules.admin.service import app_config_service
 from src.common.errors import register_all_errors
 from src.middleware.middleware import register_middleware
 from contextlib import asynccontextmanager
-from src.config import init_db
+from src.config import Config, check_db_revision, close_stores, engine
+from src.config.lifecycle import lifecycle
+from src.config.shards import shard_router
+from src.firebase import close_firebase_app
+from src.modules.auth.events import login_events
+from src.modules.auth.sessions import session_store
+from src.modules.auth.utils import bcrypt_executor
 from src.modules.auth.dependencies import RoleChecker
 from .common.errors import register_all_errors
 
 
+def register_resources(app: FastAPI):
+    # closed lowest order first: work pools, then clients, then the pool and
+    # exporters everything else may still be writing to
+    lifecycle.register(
+        "bcrypt pool", lambda: bcrypt_executor.shutdown(wait=True), order=10
+    )
+    lifecycle.register("firebase", close_firebase_app, order=20)
+    lifecycle.register("login events", login_events.flush, order=25)
+    lifecycle.register("redis", close_stores, order=30)
+    lifecycle.register("shards", shard_router.dispose, order=40)
+    lifecycle.register("database", engine.dispose, order=40)
+
+    if tracer_provider is not None:
+        lifecycle.register("tracing", tracer_provider.shutdown, order=90)
+
+    # stopped last so the lines logged while shutting down are still flushed
+    lifecycle.register(
+        "access log", app.state.access_log_listener.stop, order=100
+    )
+
+
 @asynccontextmanager
 async def life_span(app: FastAPI):
     print(f"server is starting...")
-    await init_db()
+    lifecycle.install_signal_handlers()
+    app.state.access_log_listener.start()
+    for shard in shard_router.shards:
+        await check_db_revision(shard_router.get_engine(shard))
+    register_resources(app)
+    try:
+        await app_config_service.refresh()
+    except Exception as e:
+        # the poller keeps retrying, requests see an empty config until then
+        logging.getLogger(__name__).exception(e)
+    lifecycle.start_task(
+        app_config_service.run_poller(interval=Config.APP_CONFIG_POLL_INTERVAL)
+    )
+    try:
+        await shard_router.refresh()
+    except Exception as e:
+        # business routes answer 503 until the poller manages to load the map
+        logging.getLogger(__name__).exception(e)
+    lifecycle.start_task(
+        shard_router.run_poller(interval=Config.SHARD_MAP_POLL_INTERVAL)
+    )
+    lifecycle.start_task(
+        ledger_service.run_snapshots(interval=Config.LEDGER_SNAPSHOT_INTERVAL)
+    )
+    lifecycle.start_task(
+        session_store.run_flusher(
+            interval=Config.SESSION_FLUSH_INTERVAL,
+            batch_size=Config.SESSION_FLUSH_BATCH_SIZE,
+        )
+    )
+    lifecycle.start_task(
+        login_events.run(interval=Config.LOGIN_EVENT_FLUSH_INTERVAL)
+    )
+    lifecycle.start_task(sweeper_service.run(interval=Config.SWEEP_INTERVAL))
+    lifecycle.start_task(monitor_event_loop_lag())
     yield
+    await lifecycle.shutdown(timeout=Config.SHUTDOWN_DRAIN_TIMEOUT)
     print(f"server has been stopped")
 
 
+tracer_provider = setup_tracing(Config)
+
 version = "v1"
 
 version_prefix = f"/api/{version}"
 
 app = FastAPI(
     version=version,
+    default_response_class=FastJSONResponse,
     title="Corpman API",
     description="Corpman API Servivce",
     summary="",
@@ -40,6 +115,18 @@ app = FastAPI(
             "name": "Admin",
             "description": "Section contains the Administrative functionalities",
         },
+        {
+            "name": "Customers",
+            "description": "Section contains the business customer functionalities",
+        },
+        {
+            "name": "Transactions",
+            "description": "Section contains the business transaction functionalities",
+        },
+        {
+            "name": "Ledger",
+            "description": "Section contains the double-entry ledger functionalities",
+        },
         {
             "name": "Default",
             "description": "App entry routes",
@@ -50,7 +137,7 @@ app = FastAPI(
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request, exc):
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={
             **response(
@@ -80,6 +167,12 @@ def app_entry():
     return response(message="corp-man is live 🚀")
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return metrics_response()
+
+
+app.include_router(health_router, tags=["Default"], prefix="/health")
 app.include_router(
     auth_router, tags=["Onboarding"], prefix=f"{version_prefix}/auth"
 )
@@ -87,5 +180,20 @@ app.include_router(
     admin_router,
     tags=["Admin"],
     prefix=f"{version_prefix}/admin",
-    dependencies=[Depends(RoleChecker("user"))],
+    dependencies=[Depends(RoleChecker(["user", "admin", "root"]))],
+)
+app.include_router(
+    transaction_router,
+    tags=["Transactions"],
+    prefix=f"{version_prefix}/transactions",
+)
+app.include_router(
+    customer_router,
+    tags=["Customers"],
+    prefix=f"{version_prefix}/customers",
+)
+app.include_router(
+    ledger_router,
+    tags=["Ledger"],
+    prefix=f"{version_prefix}/ledger",
 )
@@ -0,0 +1,155 @@
+import asyncio
+import functools
+import inspect
+import time
+import typing
+import uuid
+from typing import Any, Awaitable, Callable, Dict
+
+from pydantic import TypeAdapter
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.common.metrics import CACHE_LATENCY, CACHE_REQUESTS
+from src.common.serializer import decode, encode
+from src.config.db import async_session
+from src.config.redis import get_async_store, release_lock
+from src.config.settings import Config
+
+LOCK_POLL_INTERVAL = 0.05
+
+
+def cached(
+    ttl: int,
+    key: str | Callable[..., str] | None = None,
+    session_factory: Callable[..., AsyncSession] | None = None,
+):
+    """Cache an async function's result in redis for ``ttl`` seconds.
+
+    ``key`` is a format string over the function's argument names, or a
+    callable taking the same arguments. By default every argument except
+    ``self`` and sessions goes into the key. Hits are validated back into
+    the return annotation, so callers get the same types either way.
+
+    Concurrent misses for one key share a single call: callers in this
+    process await the same task, and other workers wait for the value while
+    one of them holds a short redis lock. ``invalidate`` takes the same
+    arguments as the call, ``self`` included for methods.
+
+    The shared call outlives any one caller, so it never borrows a caller's
+    session. Session arguments are swapped for one from ``session_factory``,
+    called with the key arguments by name, or from the default database.
+    """
+
+    def decorator(fn: Callable[..., Awaitable[Any]]):
+        name = f"{fn.__module__}.{fn.__qualname__}"
+        signature = inspect.signature(fn)
+        return_type = typing.get_type_hints(fn).get("return")
+        adapter = TypeAdapter(return_type) if return_type is not None else None
+        inflight: Dict[str, asyncio.Task] = {}
+
+        def key_arguments(bound: inspect.BoundArguments) -> dict:
+            return {
+                arg: value
+                for arg, value in bound.arguments.items()
+                if arg != "self" and not isinstance(value, AsyncSession)
+            }
+
+        def cache_key(*args, **kwargs) -> str:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = key_arguments(bound)
+
+            if callable(key):
+                part = key(*args, **kwargs)
+            elif key is not None:
+                part = key.format(**arguments)
+            else:
+                part = ":".join(str(value) for value in arguments.values())
+
+            return f"cache:{name}:{part}"
+
+        async def call(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            sessions = [
+                arg
+                for arg, value in bound.arguments.items()
+                if isinstance(value, AsyncSession)
+            ]
+
+            if not sessions:
+                return await fn(*args, **kwargs)
+
+            factory = session_factory or (lambda **_: async_session())
+
+            async with factory(**key_arguments(bound)) as session:
+                for arg in sessions:
+                    bound.arguments[arg] = session
+
+                return await fn(*bound.args, **bound.kwargs)
+
+        async def load(cache_key: str, args, kwargs):
+            store = get_async_store()
+            lock_key = f"{cache_key}:lock"
+            lock_timeout = Config.CACHE_LOCK_TIMEOUT
+            token = uuid.uuid4().hex
+
+            locked = await store.set(
+                lock_key, token, nx=True, px=int(lock_timeout * 1000)
+            )
+
+            if not locked:
+                # another worker is computing it, wait for its result and
+                # compute it here without the lock if it never shows up
+                deadline = time.monotonic() + lock_timeout
+
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(LOCK_POLL_INTERVAL)
+
+                    if (value := await store.get(cache_key)) is not None:
+                        return decode(value, adapter)
+
+            try:
+                result = await call(args, kwargs)
+                await store.set(cache_key, encode(result), ex=ttl)
+                return result
+            finally:
+                if locked:
+                    await release_lock(lock_key, token)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            cache_key = wrapper.cache_key(*args, **kwargs)
+
+            value = await get_async_store().get(cache_key)
+
+            if value is not None:
+                CACHE_REQUESTS.labels(name, "hit").inc()
+                CACHE_LATENCY.labels(name, "hit").observe(time.perf_counter() - started)
+                return decode(value, adapter)
+
+            task = inflight.get(cache_key)
+
+            if task is None:
+                task = asyncio.ensure_future(load(cache_key, args, kwargs))
+                inflight[cache_key] = task
+                task.add_done_callback(lambda _: inflight.pop(cache_key, None))
+
+            try:
+                # shielded so one caller going away does not cancel the others
+                return await asyncio.shield(task)
+            finally:
+                CACHE_REQUESTS.labels(name, "miss").inc()
+                CACHE_LATENCY.labels(name, "miss").observe(
+                    time.perf_counter() - started
+                )
+
+        async def invalidate(*args, **kwargs):
+            await get_async_store().delete(wrapper.cache_key(*args, **kwargs))
+
+        wrapper.cache_key = cache_key
+        wrapper.invalidate = invalidate
+
+        return wrapper
+
+    return decorator
@@ -67,4 +67,8 @@ class TransactionStatusEnum(enum.Enum):
     failed = "failed"
     refunded = "refunded"
     cancelled = "cancelled"
-    other = "other"
\ No newline at end of file
+    other = "other"
+
+class ExportFormatEnum(enum.Enum):
+    csv = "csv"
+    parquet = "parquet"
@@ -1,8 +1,9 @@
 from typing import Any, Callable
 from fastapi.requests import Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi import FastAPI, status
 from sqlalchemy.exc import SQLAlchemyError
+from src.common.responses import PreEncodedJSONResponse, dumps
 
 
 class CreditActionAppException(Exception):
@@ -68,6 +69,73 @@ class UserAlreadyVerified(CreditActionAppException):
 
     pass
 
+class BusinessNotFound(CreditActionAppException):
+    """User is not attached to a business"""
+
+    pass
+
+class InvalidImportFile(CreditActionAppException):
+    """User has uploaded a file that cannot be imported"""
+
+    pass
+
+class ImportJobNotFound(CreditActionAppException):
+    """Import job does not exist or has expired"""
+
+    pass
+
+class InvalidCursor(CreditActionAppException):
+    """User has provided a malformed pagination cursor"""
+
+    pass
+
+class IdempotencyKeyReused(CreditActionAppException):
+    """Idempotency key was already used for a different request"""
+
+    pass
+
+class IdempotencyRequestInProgress(CreditActionAppException):
+    """A request with the same idempotency key is still being processed"""
+
+    pass
+
+class UnbalancedJournalEntry(CreditActionAppException):
+    """Journal entry postings do not sum to zero"""
+
+    pass
+
+class AppModuleNotFound(CreditActionAppException):
+    """App module does not exist"""
+
+    pass
+
+class BusinessShardMoving(CreditActionAppException):
+    """Business data is being moved to another shard"""
+
+    pass
+
+class TransactionNotFound(CreditActionAppException):
+    """Transaction does not exist"""
+
+    pass
+
+class TransactionNotPending(CreditActionAppException):
+    """Transaction is no longer waiting for approval"""
+
+    pass
+
+class TransactionAlreadyApproved(CreditActionAppException):
+    """User has already approved the transaction"""
+
+    pass
+
+class RateLimitExceeded(CreditActionAppException):
+    """User has sent too many requests"""
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__()
+        self.retry_after = retry_after
+
 class AccountNotVerified(Exception):
     """Account not yet verified"""
 
@@ -87,16 +155,39 @@ class InternalServerError(Exception):
 
 def create_exception_handler(
     status_code: int, initial_detail: Any
-) -> Callable[[Request, Exception], JSONResponse]:
+) -> Callable[[Request, Exception], Response]:
+    # the body never changes, so encode it once when the handler is registered
+    body = dumps(initial_detail)
 
     async def exception_handler(request: Request, exc: CreditActionAppException):
 
-        return JSONResponse(content=initial_detail, status_code=status_code)
+        return PreEncodedJSONResponse(content=body, status_code=status_code)
 
     return exception_handler
 
 
+RATE_LIMIT_BODY = dumps(
+    {
+        "status": False,
+        "code": status.HTTP_429_TOO_MANY_REQUESTS,
+        "message": "Too many requests, please try again later",
+        "data": None,
+    }
+)
+
+
+async def rate_limit_exception_handler(request: Request, exc: RateLimitExceeded):
+
+    return PreEncodedJSONResponse(
+        content=RATE_LIMIT_BODY,
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 def register_all_errors(app: FastAPI):
+    app.add_exception_handler(RateLimitExceeded, rate_limit_exception_handler)
+
     app.add_exception_handler(
         UserAlreadyExists,
         create_exception_handler(
@@ -235,6 +326,162 @@ def register_all_errors(app: FastAPI):
         ),
     )
 
+    app.add_exception_handler(
+        BusinessNotFound,
+        create_exception_handler(
+            status_code=status.HTTP_404_NOT_FOUND,
+            initial_detail={
+                "status": False,
+                "code": status.HTTP_404_NOT_FOUND,
+                "message": "Business not found",
+                "data": None,
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        InvalidImportFile,
+        create_exception_handler(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            initial_detail={
+                "status": False,
+                "code": status.HTTP_400_BAD_REQUEST,
+                "message": "Only CSV and XLSX files with a first_name column can be imported",
+                "data": None,
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        ImportJobNotFound,
+        create_exception_handler(
+            status_code=status.HTTP_404_NOT_FOUND,
+            initial_detail={
+                "status": False,
+                "code": status.HTTP_404_NOT_FOUND,
+                "message": "Import job not found",
+                "data": None,
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        InvalidCursor,
+        create_exception_handler(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            initial_detail={
+                "status": False,
+                "code": status.HTTP_400_BAD_REQUEST,
+                "message": "Invalid pagination cursor",
+                "data": None,
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        IdempotencyKeyReused,
+        create_exception_handler(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            initial_detail={
+                "status": False,
+                "code": status.HTTP_422_UNPROCESSABLE_ENTITY,
+                "message": "Idempotency key has already been used for a different request",
+                "data": None,
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        IdempotencyRequestInProgress,
+        create_exception_handler(
+            status_code=status.HTTP_409_CONFLICT,
+            initial_detail={
+                "status": False,
+                "code": status.HTTP_409_CONFLICT,
+                "message": "A request with this idempotency key is still in progress",
+                "data": None,
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        UnbalancedJournalEntry,
+        create_exception_handler(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            initial_detail={
+                "status": False,
+                "code": status.HTTP_422_UNPROCESSABLE_ENTITY,
+                "message": "Journal entry debits and credits do not balance",
+                "data": None,
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        AppModuleNotFound,
+        create_exception_handler(
+            status_code=status.HTTP_404_NOT_FOUND,
+            initial_detail={
+                "status": False,
+                "code": status.HTTP_404_NOT_FOUND,
+                "message": "App module not found",
+                "data": None,
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        BusinessShardMoving,
+        create_exception_handler(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            initial_detail={
+                "status": False,
+                "code": status.HTTP_503_SERVICE_UNAVAILABLE,
+                "message": "Business data is being moved, please retry shortly",
+                "data": None,
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        TransactionNotFound,
+        create_exception_handler(
+            status_code=status.HTTP_404_NOT_FOUND,
+            initial_detail={
+                "status": False,
+                "code": status.HTTP_404_NOT_FOUND,
+                "message": "Transaction not found",
+                "data": None,
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        TransactionNotPending,
+        create_exception_handler(
+            status_code=status.HTTP_409_CONFLICT,
+            initial_detail={
+                "status": False,
+                "code": status.HTTP_409_CONFLICT,
+                "message": "Transaction is not awaiting approval",
+                "data": None,
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        TransactionAlreadyApproved,
+        create_exception_handler(
+            status_code=status.HTTP_409_CONFLICT,
+            initial_detail={
+                "status": False,
+                "code": status.HTTP_409_CONFLICT,
+                "message": "You have already approved this transaction",
+                "data": None,
+            },
+        ),
+    )
+
     app.add_exception_handler(
         RecommendationGenerationFailed,
         create_exception_handler(
@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import List, Sequence
+
+import orjson
+from sqlalchemy import Table
+
+from src.common.metrics import (
+    EVENT_BUFFER_DEPTH,
+    EVENT_FLUSH_LATENCY,
+    EVENTS_DROPPED,
+    EVENTS_FLUSHED,
+)
+from src.common.responses import dumps
+from src.config.db import async_session
+from src.config.redis import get_async_store
+
+logger = logging.getLogger(__name__)
+
+
+class EventBuffer:
+    """Collects rows in memory and writes them with multi-row inserts.
+
+    A batch is flushed once ``batch_size`` rows are waiting or every
+    ``interval`` seconds. When Postgres errors or is slower than
+    ``flush_timeout`` the batch is pushed onto a redis list instead, and
+    replayed from there once inserts succeed again. If redis fails too, the
+    batch goes back to the head of the buffer, which holds at most
+    ``max_events`` rows; the oldest rows past that are dropped and logged.
+    Adding an event never waits on I/O.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        table: Table,
+        batch_size: int,
+        flush_timeout: float,
+        datetime_fields: Sequence[str] = ("created_at",),
+        max_events: int | None = None,
+    ):
+        self.name = name
+        self.table = table
+        self.batch_size = batch_size
+        self.flush_timeout = flush_timeout
+        self.datetime_fields = datetime_fields
+        self.max_events = max_events or batch_size * 20
+        self.spill_key = f"event_buffer:{name}:spill"
+        self._events: List[dict] = []
+        self._full = asyncio.Event()
+        self._depth = EVENT_BUFFER_DEPTH.labels(name)
+
+    def add(self, event: dict):
+        self._events.append(event)
+        self._depth.inc()
+
+        if len(self._events) >= self.batch_size:
+            self._full.set()
+
+    async def _insert(self, rows: List[dict]):
+        started = time.perf_counter()
+
+        async with async_session() as session:
+            await session.execute(self.table.insert().values(rows))
+            await session.commit()
+
+        EVENT_FLUSH_LATENCY.labels(self.name, "postgres").observe(
+            time.perf_counter() - started
+        )
+        EVENTS_FLUSHED.labels(self.name, "postgres").inc(len(rows))
+
+    async def _spill(self, rows: List[dict]):
+        started = time.perf_counter()
+        await get_async_store().rpush(self.spill_key, *[dumps(row) for row in rows])
+
+        EVENT_FLUSH_LATENCY.labels(self.name, "redis").observe(
+            time.perf_counter() - started
+        )
+        EVENTS_FLUSHED.labels(self.name, "redis").inc(len(rows))
+
+    def _requeue(self, rows: List[dict]):
+        self._events[:0] = rows
+        self._depth.inc(len(rows))
+
+        overflow = len(self._events) - self.max_events
+
+        if overflow > 0:
+            del self._events[:overflow]
+            self._depth.dec(overflow)
+            EVENTS_DROPPED.labels(self.name).inc(overflow)
+            logger.error(
+                "%s buffer full with postgres and redis unavailable, dropped %d events",
+                self.name,
+                overflow,
+            )
+
+    def _load(self, value: bytes) -> dict:
+        row = orjson.loads(value)
+
+        for field in self.datetime_fields:
+            if row.get(field):
+                row[field] = datetime.fromisoformat(row[field])
+
+        return row
+
+    async def _replay_spilled(self):
+        store = get_async_store()
+
+        while values := await store.lpop(self.spill_key, self.batch_size):
+            rows = [self._load(value) for value in values]
+
+            try:
+                await asyncio.wait_for(self._insert(rows), self.flush_timeout)
+            except BaseException:
+                # back at the head of the list so ordering is kept
+                await store.lpush(self.spill_key, *reversed(values))
+                raise
+
+    async def flush(self):
+        while self._events:
+            rows = self._events[: self.batch_size]
+            del self._events[: self.batch_size]
+            self._depth.dec(len(rows))
+
+            # an insert cancelled by the timeout while committing can land as
+            # well as be spilled, so consumers should tolerate the odd duplicate
+            try:
+                await asyncio.wait_for(self._insert(rows), self.flush_timeout)
+            except Exception as e:
+                logger.warning("%s flush to postgres failed, spilling: %r", self.name, e)
+
+                try:
+                    await self._spill(rows)
+                except Exception as e:
+                    logger.warning("%s spill to redis failed: %r", self.name, e)
+                    self._requeue(rows)
+
+                return
+
+        await self._replay_spilled()
+
+    async def run(self, interval: float):
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+
+            self._full.clear()
+
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.exception(e)
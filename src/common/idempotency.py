@@ -0,0 +1,121 @@
+import asyncio
+import hashlib
+import uuid
+from typing import Callable, Coroutine
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from src.common.errors import IdempotencyKeyReused, IdempotencyRequestInProgress
+from src.config.redis import get_async_store, release_lock
+from src.config.settings import Config
+from src.modules.auth.dependencies import AcessTokenBearer
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+POLL_INTERVAL = 0.05
+
+access_token_bearer = AcessTokenBearer()
+
+
+def _digest(*parts: bytes) -> str:
+    hasher = hashlib.sha256()
+
+    for part in parts:
+        hasher.update(part)
+        hasher.update(b"\0")
+
+    return hasher.hexdigest()
+
+
+def _replay(cached: dict, fingerprint: str) -> Response:
+    if cached[b"fingerprint"].decode() != fingerprint:
+        raise IdempotencyKeyReused()
+
+    return Response(
+        content=cached[b"body"],
+        status_code=int(cached[b"status_code"]),
+        media_type=cached[b"media_type"].decode() or None,
+        headers={REPLAYED_HEADER: "true"},
+    )
+
+
+class IdempotentRoute(APIRoute):
+    """Route class that replays the first response for a repeated Idempotency-Key.
+
+    Keys are scoped to the authenticated user, so a retry with a refreshed
+    access token still replays. The token is checked before anything is
+    replayed; after that a replay is served from Redis and never reaches
+    Postgres.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[None, None, Response]]:
+        handler = super().get_route_handler()
+
+        if "POST" not in self.methods:
+            return handler
+
+        async def idempotent_handler(request: Request) -> Response:
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+
+            if not key:
+                return await handler(request)
+
+            # rejects expired, revoked and logged out tokens before any replay
+            token_data = await access_token_bearer(request)
+
+            store = get_async_store()
+            caller = token_data["user"]["uid"]
+            cache_key = f"idempotency:{caller}:{_digest(key.encode())}"
+            lock_key = f"{cache_key}:lock"
+            fingerprint = _digest(
+                request.method.encode(),
+                request.url.path.encode(),
+                await request.body(),
+            )
+            lock_token = f"{fingerprint}:{uuid.uuid4().hex}"
+
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + Config.IDEMPOTENCY_LOCK_TTL
+
+            while True:
+                cached = await store.hgetall(cache_key)
+
+                if cached:
+                    return _replay(cached, fingerprint)
+
+                if await store.set(
+                    lock_key, lock_token, nx=True, ex=Config.IDEMPOTENCY_LOCK_TTL
+                ):
+                    break
+
+                # a concurrent duplicate is running. Wait for its response, or
+                # take over if it released the lock without caching one (5xx)
+                if loop.time() >= deadline:
+                    raise IdempotencyRequestInProgress()
+
+                await asyncio.sleep(POLL_INTERVAL)
+
+            try:
+                response = await handler(request)
+
+                # server errors are left uncached so the client can retry them
+                if response.status_code < 500 and hasattr(response, "body"):
+                    async with store.pipeline(transaction=True) as pipe:
+                        pipe.hset(
+                            cache_key,
+                            mapping={
+                                "fingerprint": fingerprint,
+                                "status_code": response.status_code,
+                                "media_type": response.media_type or "",
+                                "body": response.body,
+                            },
+                        )
+                        pipe.expire(cache_key, Config.IDEMPOTENCY_TTL)
+                        await pipe.execute()
+
+                return response
+            finally:
+                await release_lock(lock_key, lock_token)
+
+        return idempotent_handler
@@ -1,41 +1,53 @@
+import threading
+from contextvars import ContextVar
+from functools import lru_cache
 from typing import List
-import mailtrap as mt
+from fastapi import BackgroundTasks
 from src.config import Config
-import requests
+from src.config.lifecycle import PendingWork, lifecycle
+from src.common.metrics import MAIL_QUEUE_DEPTH
+from src.common.tracing import bind_context, traced
+
+# mailtrap and requests are imported where they are used to keep app import fast
 
 # email_templates: dict[str, str] = {"sign_up": "", "verify_email": ""}
 
 
 class MailData:
-    emails = List[mt.Address]
+    emails: List[str]
     subject: str
     message: str
 
     def __init__(self, recipients: List[str], subject: str, message: str):
         self.subject = subject
         self.message = message
-        self.emails = []
+        self.emails = list(recipients)
+
 
-        for recipient in recipients:
-            self.emails.append(mt.Address(email=recipient))
+@lru_cache(maxsize=None)
+def get_mail_client():
+    import mailtrap as mt
 
+    return mt.MailtrapClient(token=Config.MAILTRAP_TOKEN)
 
+
+@traced("mail.send")
 def sendMail(data: MailData):
     try:
+        import mailtrap as mt
+
         # create mail object
         mail = mt.Mail(
             sender=mt.Address(
                 email=Config.MAIL_SENDER_EMAIL, name=Config.MAIL_SENDER_NAME
             ),
-            to=data.emails,
+            to=[mt.Address(email=email) for email in data.emails],
             subject=data.subject,
             html=data.message,
             # text="Congrats for sending test email with Mailtrap!",
         )
 
-        # create client and send
-        client = mt.MailtrapClient(token=Config.MAILTRAP_TOKEN)
-        client.send(mail)
+        get_mail_client().send(mail)
         print("mail sent...")
     except Exception as e:
         print(e)
@@ -45,6 +57,8 @@ def sendMail(data: MailData):
 
 def send_simple_message():
     try:
+        import requests
+
         result = requests.post(
             "https://api.mailgun.net/v3/sandbox7a884f4a9f5c4966958854eddd237895.mailgun.org/messages",
             auth=("api", Config.MAIL_GUN_API_KEY),
@@ -61,3 +75,76 @@ def send_simple_message():
 
     except Exception as e:
         print(f"An error occurred {str(e)}")
+
+
+# shutdown waits for queued mails so sign-up and reset emails are not dropped
+pending_mails = lifecycle.track(PendingWork("mails"))
+
+
+_settle_lock = threading.Lock()
+
+
+class QueuedMail:
+    """A mail counted in the queue until its task finishes or is abandoned."""
+
+    __slots__ = ("data", "started", "settled")
+
+    def __init__(self, data: MailData):
+        self.data = data
+        self.started = False
+        self.settled = False
+
+    def start(self) -> bool:
+        with _settle_lock:
+            if self.settled:
+                return False
+
+            self.started = True
+            return True
+
+    def settle(self, abandoned: bool = False) -> bool:
+        # a started send runs in the threadpool and may outlive a cancelled
+        # request, so only its own task settles it
+        with _settle_lock:
+            if self.settled or (abandoned and self.started):
+                return False
+
+            self.settled = True
+
+        MAIL_QUEUE_DEPTH.dec()
+        pending_mails.end()
+        return True
+
+
+# mails queued by the current request, see MailQueueMiddleware
+request_mails: ContextVar[List[QueuedMail] | None] = ContextVar(
+    "request_mails", default=None
+)
+
+
+def _send_queued_mail(mail: QueuedMail):
+    if not mail.start():
+        return
+
+    try:
+        sendMail(mail.data)
+    finally:
+        mail.settle()
+
+
+def settle_abandoned_mails(mails: List[QueuedMail]) -> int:
+    """Uncount mails whose task never ran: the handler raised after queueing
+    them, or the client went away before the response finished."""
+    return sum(mail.settle(abandoned=True) for mail in mails)
+
+
+def enqueue_mail(bg_task: BackgroundTasks, data: MailData):
+    mail = QueuedMail(data)
+    MAIL_QUEUE_DEPTH.inc()
+    pending_mails.begin()
+
+    mails = request_mails.get()
+    if mails is not None:
+        mails.append(mail)
+
+    bg_task.add_task(bind_context(_send_queued_mail), mail)
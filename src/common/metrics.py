@@ -0,0 +1,161 @@
+import asyncio
+import os
+
+from fastapi import Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# with PROMETHEUS_MULTIPROC_DIR set every worker writes its samples to that
+# directory and /metrics aggregates them, whichever worker serves the scrape
+
+REQUEST_COUNT = Counter(
+    "http_requests_total",
+    "HTTP requests by method, route and status",
+    ["method", "route", "status"],
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method and route",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Database connections currently checked out of the pool",
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections",
+    "Database connections open beyond the pool size",
+    multiprocess_mode="livesum",
+)
+REDIS_COMMAND_LATENCY = Histogram(
+    "redis_command_duration_seconds",
+    "Redis command latency by command",
+    ["command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+MAIL_QUEUE_DEPTH = Gauge(
+    "mail_queue_depth",
+    "Mails queued as background tasks and not yet sent",
+    multiprocess_mode="livesum",
+)
+BCRYPT_POOL_WAIT = Histogram(
+    "bcrypt_pool_wait_seconds",
+    "Time password hashing jobs wait for a bcrypt pool thread",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "SQL statements issued per request by route",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds",
+    "Time spent executing SQL per request by route",
+    ["route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+N_PLUS_ONE_REQUESTS = Counter(
+    "db_n_plus_one_requests_total",
+    "Requests that repeated a statement N_PLUS_ONE_THRESHOLD times or more",
+    ["route"],
+)
+EVENT_LOOP_LAG = Gauge(
+    "event_loop_lag_seconds",
+    "How late the event loop woke up from a timed sleep",
+    multiprocess_mode="livemax",
+)
+EVENT_BUFFER_DEPTH = Gauge(
+    "event_buffer_depth",
+    "Events held in memory waiting to be flushed, by buffer",
+    ["buffer"],
+    multiprocess_mode="livesum",
+)
+EVENT_FLUSH_LATENCY = Histogram(
+    "event_buffer_flush_duration_seconds",
+    "Time to write one batch of buffered events, by buffer and destination",
+    ["buffer", "destination"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+EVENTS_FLUSHED = Counter(
+    "event_buffer_events_total",
+    "Buffered events written, by buffer and destination",
+    ["buffer", "destination"],
+)
+EVENTS_DROPPED = Counter(
+    "event_buffer_dropped_total",
+    "Buffered events discarded because neither postgres nor redis took them",
+    ["buffer"],
+)
+SWEEPER_ROWS_DELETED = Counter(
+    "sweeper_rows_deleted_total",
+    "Rows removed by the maintenance sweeper, by retention policy",
+    ["policy"],
+)
+SWEEPER_RUN_DURATION = Histogram(
+    "sweeper_run_duration_seconds",
+    "Time one retention policy took to sweep, by policy",
+    ["policy"],
+    buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 300, 900),
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cached function calls by function and result (hit or miss)",
+    ["name", "result"],
+)
+CACHE_LATENCY = Histogram(
+    "cache_request_duration_seconds",
+    "Cached function call latency by function and result (hit or miss)",
+    ["name", "result"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+SHUTDOWN_DRAIN_DURATION = Histogram(
+    "shutdown_drain_duration_seconds",
+    "Time shutdown spent waiting for in-flight work to finish",
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 15, 20, 25, 30),
+)
+
+
+def instrument_engine(engine: AsyncEngine):
+    pool = engine.sync_engine.pool
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKED_OUT.inc()
+        DB_POOL_OVERFLOW.set(max(pool.overflow(), 0))
+
+    @event.listens_for(engine.sync_engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        DB_POOL_CHECKED_OUT.dec()
+        DB_POOL_OVERFLOW.set(max(pool.overflow(), 0))
+
+
+async def monitor_event_loop_lag(interval: float = 1.0):
+    loop = asyncio.get_running_loop()
+
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.set(max(loop.time() - started - interval, 0))
+
+
+def metrics_response() -> Response:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
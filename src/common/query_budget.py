@@ -0,0 +1,55 @@
+"""Pytest plugin that fails tests whose requests exceed a SQL query budget.
+
+Enable it with ``pytest -p src.common.query_budget`` and mark tests::
+
+    @pytest.mark.query_budget(3)
+    @pytest.mark.query_budget({"/api/v1/auth/me": 2})
+
+An int applies to every request the test makes. A dict sets budgets per
+route template, and routes that are not listed are not checked.
+"""
+import pytest
+
+from src.config.db import query_stats_observers
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "query_budget(budget): fail when a request issues more SQL statements "
+        "than budget (an int, or a dict of route template to int)",
+    )
+
+
+@pytest.fixture(autouse=True)
+def _query_budget(request):
+    marker = request.node.get_closest_marker("query_budget")
+
+    if marker is None:
+        yield
+        return
+
+    budget = marker.args[0]
+    seen = []
+
+    def observe(method, route, stats):
+        seen.append((method, route, stats.count, stats.n_plus_one))
+
+    query_stats_observers.append(observe)
+
+    try:
+        yield
+    finally:
+        query_stats_observers.remove(observe)
+
+    over = []
+
+    for method, route, count, repeated in seen:
+        limit = budget.get(route) if isinstance(budget, dict) else budget
+
+        if limit is not None and count > limit:
+            over.append(f"{method} {route}: {count} queries (budget {limit})")
+            over.extend(f"    repeated: {statement}" for statement in repeated)
+
+    if over:
+        pytest.fail("query budget exceeded\n" + "\n".join(over), pytrace=False)
@@ -0,0 +1,53 @@
+from functools import lru_cache
+from typing import Any
+
+import orjson
+from pydantic import TypeAdapter
+
+from src.common.responses import dumps
+from src.config.settings import Config
+
+# first byte of every stored value, JSON text never starts with either
+RAW = b"\x00"
+ZSTD = b"\x01"
+
+
+@lru_cache(maxsize=None)
+def _zstd():
+    # optional, without the zstandard package values are stored uncompressed
+    try:
+        import zstandard
+    except ImportError:
+        return None
+
+    return zstandard.ZstdCompressor(level=3), zstandard.ZstdDecompressor()
+
+
+def encode(value: Any) -> bytes:
+    data = dumps(value)
+    threshold = Config.CACHE_COMPRESS_THRESHOLD
+
+    if threshold and len(data) >= threshold and (codec := _zstd()) is not None:
+        return ZSTD + codec[0].compress(data)
+
+    return RAW + data
+
+
+def decode(data: bytes, adapter: TypeAdapter | None = None) -> Any:
+    """Decode a stored value, validating it into ``adapter``'s type if given.
+
+    Values written before the header existed are plain JSON text.
+    """
+    header, body = data[:1], data[1:]
+
+    if header == ZSTD:
+        codec = _zstd()
+        if codec is None:
+            raise RuntimeError("value is zstd compressed, install zstandard")
+        value = orjson.loads(codec[1].decompress(body))
+    elif header == RAW:
+        value = orjson.loads(body)
+    else:
+        value = orjson.loads(data)
+
+    return adapter.validate_python(value) if adapter is not None else value
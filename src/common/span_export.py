@@ -0,0 +1,30 @@
+import json
+import threading
+from typing import Sequence
+
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+
+class JSONFileSpanExporter(SpanExporter):
+    """Appends finished spans to a file, one JSON document per line."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "a")
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(
+            json.dumps(json.loads(span.to_json()), separators=(",", ":")) + "\n"
+            for span in spans
+        )
+
+        with self._lock:
+            self._file.write(lines)
+            self._file.flush()
+
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        with self._lock:
+            self._file.close()
@@ -0,0 +1,156 @@
+import functools
+import inspect
+from contextlib import nullcontext
+
+from opentelemetry import context as otel_context
+from opentelemetry import propagate, trace
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+tracer = trace.get_tracer("corpman")
+
+# flipped by setup_tracing; while off every helper here is a passthrough
+_enabled = False
+
+
+def setup_tracing(config):
+    global _enabled
+
+    if not config.TRACING_ENABLED:
+        return None
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    if config.TRACING_EXPORTER == "file":
+        from .span_export import JSONFileSpanExporter
+
+        exporter = JSONFileSpanExporter(config.TRACING_FILE)
+    else:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter,
+        )
+
+        exporter = OTLPSpanExporter(endpoint=config.TRACING_OTLP_ENDPOINT)
+
+    # head sampling: the keep/drop decision is made once at the root span
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": "corpman-api"}),
+        sampler=ParentBased(TraceIdRatioBased(config.TRACING_SAMPLE_RATE)),
+    )
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+
+    _enabled = True
+
+    return provider
+
+
+def span(name: str, attributes: dict | None = None):
+    if not _enabled:
+        return nullcontext()
+
+    return tracer.start_as_current_span(name, attributes=attributes)
+
+
+def traced(name: str):
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def bind_context(fn):
+    """Carry the current trace context into a background task."""
+    if not _enabled:
+        return fn
+
+    ctx = otel_context.get_current()
+
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            token = otel_context.attach(ctx)
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                otel_context.detach(token)
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = otel_context.attach(ctx)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            otel_context.detach(token)
+
+    return wrapper
+
+
+def start_query_span(statement: str):
+    if not _enabled:
+        return None
+
+    return tracer.start_span(
+        "db.query",
+        kind=trace.SpanKind.CLIENT,
+        attributes={"db.system": "postgresql", "db.statement": statement[:2048]},
+    )
+
+
+class TracingMiddleware:
+    """Opens a server span per request, continuing any incoming traceparent."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        carrier = {
+            name.decode("latin-1"): value.decode("latin-1")
+            for name, value in scope["headers"]
+        }
+
+        with tracer.start_as_current_span(
+            f"{scope['method']} {scope['path']}",
+            context=propagate.extract(carrier),
+            kind=trace.SpanKind.SERVER,
+            attributes={
+                "http.method": scope["method"],
+                "http.target": scope["path"],
+            },
+        ) as request_span:
+
+            async def send_wrapper(message: Message):
+                if message["type"] == "http.response.start":
+                    request_span.set_attribute("http.status_code", message["status"])
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+
+                if route:
+                    request_span.update_name(f"{scope['method']} {route}")
+                    request_span.set_attribute("http.route", route)
@@ -1,5 +1,6 @@
     
 import random
+import re
 import string
 from fastapi import status
 
@@ -7,4 +8,13 @@ def generate_random_numbers(length):
         return "".join(random.choices(string.digits, k=length))
   
 def response(status: bool = True, code: int = status.HTTP_200_OK, message: str = "sucess", data=None, error=None):
-        return {"status": status, "code": code, "message": message, "data": data, "error": error}
\ No newline at end of file
+        return {"status": status, "code": code, "message": message, "data": data, "error": error}
+
+
+def normalize_phone(phone: str | None) -> str | None:
+        if not phone:
+                return None
+
+        digits = re.sub(r"\D", "", str(phone))
+
+        return digits or None
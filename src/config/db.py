@@ -1,9 +1,18 @@
-from typing import AsyncGenerator
-from sqlmodel import SQLModel, create_engine
+import logging
+import pathlib
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import AsyncGenerator, Callable, List
+from sqlalchemy import event, text
+from sqlalchemy.exc import ProgrammingError
+from sqlmodel import create_engine
 from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import sessionmaker
 from src.config import Config
+from src.common.metrics import instrument_engine
+from src.common.tracing import start_query_span
 
 engine = AsyncEngine(
     create_engine(
@@ -12,15 +21,127 @@ engine = AsyncEngine(
     )
 )
 
+instrument_engine(engine)
 
-async def init_db():
-    async with engine.begin() as conn:
 
-        await conn.run_sync(SQLModel.metadata.create_all)
+class QueryStats:
+    """SQL statements issued while serving one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+    @property
+    def n_plus_one(self) -> List[str]:
+        # the same parameterised statement over and over is a lazy-load loop
+        return [
+            statement
+            for statement, count in self.statements.items()
+            if count >= Config.N_PLUS_ONE_THRESHOLD
+        ]
+
+
+query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+# called with (method, route, stats) once a request finishes, see query_budget
+query_stats_observers: List[Callable[[str, str, QueryStats], None]] = []
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_span = start_query_span(statement)
+
+    if query_stats.get() is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context._query_span is not None:
+        context._query_span.end()
+
+    stats = query_stats.get()
+
+    if stats is not None and hasattr(context, "_query_started"):
+        stats.record(statement, time.perf_counter() - context._query_started)
+
+
+def _handle_error(exception_context):
+    query_span = getattr(exception_context.execution_context, "_query_span", None)
+
+    if query_span is not None:
+        query_span.record_exception(exception_context.original_exception)
+        query_span.end()
+
+
+def watch_queries(db_engine: AsyncEngine):
+    """Feed an engine's statements into query stats and tracing."""
+    event.listen(db_engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(db_engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(db_engine.sync_engine, "handle_error", _handle_error)
+
+
+watch_queries(engine)
+
+async_session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = pathlib.Path(__file__).parents[2] / "alembic.ini"
+
+
+def get_migration_heads() -> set:
+    from alembic.config import Config as AlembicConfig
+    from alembic.script import ScriptDirectory
+
+    alembic_config = AlembicConfig(str(ALEMBIC_INI))
+    alembic_config.set_main_option(
+        "script_location", str(ALEMBIC_INI.parent / "migrations")
+    )
+
+    return set(ScriptDirectory.from_config(alembic_config).get_heads())
+
+
+async def check_db_revision(db_engine: AsyncEngine = engine):
+    """Compare the database's alembic revision with the migration heads.
+
+    The schema is owned by ``alembic upgrade head``. Boot only reads one row
+    instead of reflecting every table.
+    """
+    try:
+        async with db_engine.connect() as conn:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+            current = set(result.scalars().all())
+    except ProgrammingError:
+        current = set()
+
+    heads = get_migration_heads()
+
+    if current != heads:
+        message = (
+            f"database {db_engine.url!r} revision {sorted(current)} does not "
+            f"match migration heads {sorted(heads)}, run `alembic upgrade head`"
+        )
+
+        if Config.STRICT_DB_REVISION:
+            raise RuntimeError(message)
+
+        logger.warning(message)
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    Session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    # requests get their stats from QueryStatsMiddleware, anything else
+    # resolving the dependency is counted until the session closes
+    token = query_stats.set(QueryStats()) if query_stats.get() is None else None
 
-    async with Session() as session:
-        yield session
+    try:
+        async with async_session() as session:
+            yield session
+    finally:
+        if token is not None:
+            query_stats.reset(token)
@@ -0,0 +1,182 @@
+import asyncio
+import inspect
+import logging
+import os
+import signal
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Set, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.common.metrics import SHUTDOWN_DRAIN_DURATION
+
+logger = logging.getLogger(__name__)
+
+
+class PendingWork:
+    """Thread-safe count of in-flight work that shutdown has to wait for."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def begin(self):
+        with self._lock:
+            self._count += 1
+
+    def end(self):
+        with self._lock:
+            self._count -= 1
+
+    async def wait_idle(self, poll_interval: float = 0.05):
+        while self._count > 0:
+            await asyncio.sleep(poll_interval)
+
+
+class Lifecycle:
+    """Owns the app's long-lived resources and shuts them down in order.
+
+    Requests stop being admitted as soon as the process gets SIGTERM or
+    SIGINT. The server only runs the lifespan shutdown once every connection
+    has closed, which is too late to turn requests away or to end long-lived
+    streams. The lifespan shutdown then cancels background loops, waits for
+    registered work to drain within the deadline, and closes resources from
+    the lowest ``order`` up.
+    """
+
+    def __init__(self):
+        self.accepting = True
+        self.requests = PendingWork("requests")
+        self._work: List[PendingWork] = [self.requests]
+        self._tasks: Set[asyncio.Task] = set()
+        # keyed by name so a repeated lifespan startup replaces, not appends
+        self._resources: Dict[str, Tuple[int, Callable]] = {}
+        self._stop_callbacks: List[Callable[[], None]] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._signals_installed = False
+
+    def track(self, work: PendingWork) -> PendingWork:
+        self._work.append(work)
+        return work
+
+    def register(self, name: str, close: Callable[[], Awaitable | None], order: int):
+        self._resources[name] = (order, close)
+
+    def on_stop(self, callback: Callable[[], None]):
+        """Run ``callback`` on the event loop once requests stop being admitted."""
+        self._stop_callbacks.append(callback)
+
+    def stop_accepting(self):
+        if not self.accepting:
+            return
+
+        self.accepting = False
+        logger.info("stopped accepting requests")
+
+        # signal handlers can fire mid-callback, so defer to the loop
+        if self._loop is not None and not self._loop.is_closed():
+            for callback in self._stop_callbacks:
+                self._loop.call_soon_threadsafe(callback)
+
+    def install_signal_handlers(self):
+        """Flip ``accepting`` on SIGTERM/SIGINT, then run the previous handler."""
+        self._loop = asyncio.get_running_loop()
+
+        if (
+            self._signals_installed
+            or threading.current_thread() is not threading.main_thread()
+        ):
+            return
+
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            previous = signal.getsignal(sig)
+
+            def handler(signum, frame, previous=previous):
+                self.stop_accepting()
+
+                if callable(previous):
+                    previous(signum, frame)
+                elif previous == signal.SIG_DFL:
+                    signal.signal(signum, signal.SIG_DFL)
+                    os.kill(os.getpid(), signum)
+
+            signal.signal(sig, handler)
+
+        self._signals_installed = True
+
+    def start_task(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def shutdown(self, timeout: float):
+        self.stop_accepting()
+        started = time.perf_counter()
+
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        for work in self._work:
+            remaining = timeout - (time.perf_counter() - started)
+
+            try:
+                await asyncio.wait_for(work.wait_idle(), timeout=max(remaining, 0))
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "shutdown deadline hit with %d %s still in flight",
+                    work.count,
+                    work.name,
+                )
+
+        drained = time.perf_counter() - started
+        SHUTDOWN_DRAIN_DURATION.observe(drained)
+        logger.info("drained in-flight work in %.3fs", drained)
+
+        resources = sorted(self._resources.items(), key=lambda r: r[1][0])
+
+        for name, (_, close) in resources:
+            try:
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.exception("failed to close %s: %s", name, e)
+
+
+lifecycle = Lifecycle()
+
+
+class DrainMiddleware:
+    """Counts in-flight requests and turns new ones away once shutdown starts."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        if not lifecycle.accepting:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 503,
+                    "headers": [(b"connection", b"close"), (b"retry-after", b"1")],
+                }
+            )
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        lifecycle.requests.begin()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            lifecycle.requests.end()
@@ -1,38 +1,185 @@
 import redis
+import redis.asyncio as aioredis
+import time
+from functools import lru_cache
 from typing import Any
 from . import Config
-import json
+from src.common.metrics import REDIS_COMMAND_LATENCY
+from src.common.serializer import decode, encode
+from src.common.tracing import span
+import uuid
 
-JTI_EXPIRY = 3600
+# revoked tokens are grouped by the hour they expire in, each bucket is
+# dropped whole once the last token in it has expired
+REVOCATION_BUCKET_SECONDS = 3600
+REVOCATION_PREFIX = "revoked:"
 
-store = redis.Redis.from_url(url=Config.REDIS_URL)
+
+class InstrumentedRedis(redis.Redis):
+    def execute_command(self, *args, **options):
+        command = str(args[0]).lower()
+        started = time.perf_counter()
+        try:
+            with span("redis.command", {"db.system": "redis", "db.operation": command}):
+                return super().execute_command(*args, **options)
+        finally:
+            REDIS_COMMAND_LATENCY.labels(command).observe(time.perf_counter() - started)
+
+
+class InstrumentedAsyncRedis(aioredis.Redis):
+    async def execute_command(self, *args, **options):
+        command = str(args[0]).lower()
+        started = time.perf_counter()
+        try:
+            with span("redis.command", {"db.system": "redis", "db.operation": command}):
+                return await super().execute_command(*args, **options)
+        finally:
+            REDIS_COMMAND_LATENCY.labels(command).observe(time.perf_counter() - started)
+
+
+# clients are built on first use so importing the app stays side-effect free
+
+
+@lru_cache(maxsize=None)
+def get_store() -> InstrumentedRedis:
+    return InstrumentedRedis.from_url(url=Config.REDIS_URL)
+
+
+@lru_cache(maxsize=None)
+def get_async_store() -> InstrumentedAsyncRedis:
+    return InstrumentedAsyncRedis.from_url(url=Config.REDIS_URL)
+
+
+async def close_stores():
+    if get_store.cache_info().currsize:
+        get_store().close()
+        get_store.cache_clear()
+
+    if get_async_store.cache_info().currsize:
+        await get_async_store().aclose()
+        get_async_store.cache_clear()
+        get_release_lock_script.cache_clear()
+        get_extend_lock_script.cache_clear()
+
+
+# delete a lock only while it still holds the caller's token, so a holder
+# whose TTL ran out cannot free a lock another request has since taken
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+# push a lock's expiry out only while the caller still holds it
+EXTEND_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+@lru_cache(maxsize=None)
+def get_release_lock_script():
+    return get_async_store().register_script(RELEASE_LOCK_SCRIPT)
+
+
+async def release_lock(key: str, token: str) -> bool:
+    return bool(await get_release_lock_script()(keys=[key], args=[token]))
+
+
+@lru_cache(maxsize=None)
+def get_extend_lock_script():
+    return get_async_store().register_script(EXTEND_LOCK_SCRIPT)
+
+
+async def extend_lock(key: str, token: str, ttl: float) -> bool:
+    return bool(
+        await get_extend_lock_script()(keys=[key], args=[token, int(ttl * 1000)])
+    )
+
+
+@lru_cache(maxsize=None)
+def supports_field_ttl() -> bool:
+    """Whether revocation fields get their own expiry, checked once per process."""
+    if Config.REVOCATION_FIELD_TTL is not None:
+        return Config.REVOCATION_FIELD_TTL
+
+    try:
+        version = get_store().info("server")["redis_version"]
+        return tuple(int(part) for part in version.split(".")[:2]) >= (7, 4)
+    except Exception:
+        return False
+
+
+def revocation_bucket(exp: int) -> str:
+    return f"{REVOCATION_PREFIX}{int(exp) // REVOCATION_BUCKET_SECONDS}"
+
+
+def jti_field(jti: str) -> bytes:
+    # 16 raw bytes instead of the 36 character uuid string
+    try:
+        return uuid.UUID(jti).bytes
+    except ValueError:
+        return jti.encode()
 
 
 class RedisService:
 
-    def add_jti_to_block_list(self, jti: str) -> None:
-        store.set(name=jti, value="", ex=JTI_EXPIRY)
+    def __init__(self, store: redis.Redis | None = None):
+        self._store = store
+
+    @property
+    def store(self) -> redis.Redis:
+        return self._store if self._store is not None else get_store()
+
+    def add_jti_to_block_list(self, jti: str, exp: int) -> None:
+        """Revoke a token until its own ``exp``.
+
+        Per-field expiry needs Redis 7.4 (HEXPIREAT), see supports_field_ttl.
+        Without it, fields live until their bucket expires at the end of
+        the hour, which is harmless as expired tokens fail signature checks
+        anyway.
+        """
+        if exp <= time.time():
+            return
+
+        key = revocation_bucket(exp)
+        field = jti_field(jti)
+        bucket = int(exp) // REVOCATION_BUCKET_SECONDS
+        bucket_end = (bucket + 1) * REVOCATION_BUCKET_SECONDS
 
-    def token_in_blocklist(self, jti: str) -> bool:
-        result = store.get(jti)
+        pipe = self.store.pipeline(transaction=False)
+        pipe.hset(key, field, b"")
+        if supports_field_ttl():
+            pipe.hexpireat(key, int(exp), field)
+        pipe.expireat(key, bucket_end)
+        pipe.execute()
 
-        return result is not None
+    def token_in_blocklist(self, jti: str, exp: int) -> bool:
+        return bool(self.store.hexists(revocation_bucket(exp), jti_field(jti)))
 
-    def save_json(self, key: str, value: Any):
-        json_value = json.dumps(value)
-        store.set(name=str(key), value=json_value)
+    def save_json(self, key: str, value: Any, ttl: int | None = None):
+        self.store.set(name=str(key), value=encode(value), ex=ttl)
 
     def get_json(self, key: str):
-        result = store.get(name=str(key))
+        result = self.store.get(name=str(key))
 
-        return (
-            []
-            if not result
-            else eval(result) if isinstance(result, bytes) else result
-        )
+        return [] if not result else decode(result)
 
-    def remove_store_value_if_exist(self, key: str):
-        value = self.get_json(str(key))
+    def save_hash(self, key: str, mapping: dict, ttl: int | None = None):
+        self.store.hset(name=str(key), mapping=mapping)
+
+        if ttl:
+            self.store.expire(name=str(key), time=ttl)
+
+    def get_hash(self, key: str) -> dict:
+        result = self.store.hgetall(name=str(key))
 
-        if value:
-            store.unlink(key)
+        return {k.decode(): v.decode() for k, v in result.items()}
+
+    def remove_store_value_if_exist(self, key: str):
+        # UNLINK is a no-op for missing keys, no need to read the value first
+        self.store.unlink(str(key))
@@ -11,6 +11,82 @@ class Settings(BaseSettings):
     MAIL_SENDER_NAME: str
     MAIL_SENDER_EMAIL: str
     FRONTEND_URL: str
+    EXPORT_CHUNK_SIZE: int = 5000
+    CUSTOMER_IMPORT_CHUNK_SIZE: int = 1000
+    IDEMPOTENCY_TTL: int = 86400
+    IDEMPOTENCY_LOCK_TTL: int = 30
+    LEDGER_SNAPSHOT_INTERVAL: int = 3600
+    ACCESS_LOG_SAMPLE_RATE: float = 1.0
+    ACCESS_LOG_SLOW_MS: float = 1000
+    BCRYPT_POOL_SIZE: int = 4
+    PROFILING_ENABLED: bool = False
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_DIR: str = "profiles"
+    PROFILE_FORMAT: str = "html"
+    ENVIRONMENT: str = "production"
+    N_PLUS_ONE_THRESHOLD: int = 5
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATE: float = 0.01
+    TRACING_EXPORTER: str = "otlp"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACING_FILE: str = "traces.jsonl"
+    STRICT_DB_REVISION: bool = False
+    RATE_LIMITS: dict[str, str] = {}
+    # comma separated proxy addresses whose X-Forwarded-For is trusted for the
+    # client IP, "*" trusts any peer (only safe when the app is not exposed)
+    FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+    HEALTH_CACHE_TTL: float = 2.0
+    HEALTH_CHECK_TIMEOUT: float = 1.0
+    MAIL_HEALTH_HOST: str = "send.api.mailtrap.io"
+    SHUTDOWN_DRAIN_TIMEOUT: float = 25.0
+    APP_CONFIG_POLL_INTERVAL: float = 5.0
+    # shard name -> database url, DATABASE_URL is always the "default" shard
+    SHARD_DATABASE_URLS: dict[str, str] = {}
+    # business id -> shard name, overridden at runtime by the redis shard map
+    SHARD_MAP: dict[str, str] = {}
+    SHARD_MAP_POLL_INTERVAL: float = 5.0
+    SESSION_FLUSH_INTERVAL: float = 30.0
+    SESSION_FLUSH_BATCH_SIZE: int = 500
+    LOGIN_EVENT_BATCH_SIZE: int = 500
+    LOGIN_EVENT_FLUSH_INTERVAL: float = 2.0
+    # a batch that takes longer than this to insert goes to redis instead
+    LOGIN_EVENT_FLUSH_TIMEOUT: float = 2.0
+    SWEEP_INTERVAL: int = 3600
+    SWEEP_BATCH_SIZE: int = 1000
+    SWEEP_BATCH_SLEEP: float = 0.1
+    # 0 removes the cap
+    SWEEP_MAX_ROWS_PER_SECOND: int = 5000
+    # refreshed after every batch, so only a stalled sweeper loses the lock
+    SWEEP_LOCK_TTL: int = 60
+    # verification codes are kept this long past expiry for support lookups
+    TOKEN_RETENTION_HOURS: int = 24
+    LOGIN_EVENT_RETENTION_DAYS: int = 180
+    # per-token expiry inside revocation buckets, needs Redis 7.4 or newer;
+    # left unset it is turned on when the server reports a new enough version
+    REVOCATION_FIELD_TTL: bool | None = None
+    # cached values at least this many bytes are zstd compressed, 0 disables
+    CACHE_COMPRESS_THRESHOLD: int = 1024
+    CACHE_LOCK_TIMEOUT: float = 5.0
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    # 0 runs one worker per available CPU, up to SERVER_MAX_WORKERS
+    SERVER_WORKERS: int = 0
+    SERVER_MAX_WORKERS: int = 4
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEPALIVE: int = 5
+    # workers are recycled after this many requests, jittered so they do
+    # not all restart together; 0 disables recycling
+    SERVER_MAX_REQUESTS: int = 10000
+    SERVER_MAX_REQUESTS_JITTER: int = 1000
+    SERVER_TIMEOUT: int = 60
+    # should cover SHUTDOWN_DRAIN_TIMEOUT plus closing resources
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+    SERVER_PRELOAD: bool = False
+    # events kept per business for Last-Event-ID resume
+    APPROVAL_STREAM_MAXLEN: int = 1000
+    APPROVAL_HEARTBEAT_INTERVAL: float = 15.0
+    # events buffered per SSE connection before a slow client is dropped
+    APPROVAL_QUEUE_SIZE: int = 100
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -0,0 +1,208 @@
+import asyncio
+import logging
+import uuid
+from types import MappingProxyType
+from typing import Dict, List, Mapping
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.common.errors import BusinessShardMoving
+from src.common.metrics import instrument_engine
+from .db import async_session, engine, watch_queries
+from .redis import get_async_store
+from .settings import Config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SHARD = "default"
+
+SHARD_MAP_KEY = "shard_map"
+SHARD_MAP_VERSION_KEY = "shard_map:version"
+
+# shard map value for a business whose rows are being copied between shards
+MOVING = "moving"
+
+# business scoped tables in foreign key order, with the filter selecting
+# one business's rows; users and businesses are global and only copied so
+# that foreign keys hold on the shard
+SHARDED_TABLES: List[tuple[str, str]] = [
+    ("customers", "business_id = :business_id"),
+    (
+        "wallets",
+        "customer_id IN (SELECT id FROM customers WHERE business_id = :business_id)",
+    ),
+    ("assets", "business_id = :business_id"),
+    ("transaction_types_setting", "business_id = :business_id"),
+    ("transactions", "business_id = :business_id"),
+    (
+        "transaction_approvals",
+        "transaction_id IN (SELECT id FROM transactions WHERE business_id = :business_id)",
+    ),
+    ("ledger_accounts", "business_id = :business_id"),
+    ("journal_entries", "business_id = :business_id"),
+    (
+        "ledger_postings",
+        "account_id IN (SELECT id FROM ledger_accounts WHERE business_id = :business_id)",
+    ),
+    (
+        "ledger_balance_snapshots",
+        "account_id IN (SELECT id FROM ledger_accounts WHERE business_id = :business_id)",
+    ),
+]
+
+REFERENCE_TABLES: List[tuple[str, str]] = [
+    ("businesses", "id = :business_id"),
+    ("users", "business_id = :business_key"),
+]
+
+
+def fence_key(business_id: uuid.UUID | str) -> int:
+    """Advisory lock key guarding a business's writes during a shard move."""
+    return int.from_bytes(uuid.UUID(str(business_id)).bytes[:8], "big", signed=True)
+
+
+class ShardSession(AsyncSession):
+    """Session on the shard a business lived on when the session was opened.
+
+    A long-lived session (an import job, a slow request) can outlast a shard
+    move, so every commit takes a shared advisory lock for the business and
+    re-reads its shard from redis. The move holds the exclusive lock while it
+    copies, so a commit either lands before the copy or fails once the
+    business has left this shard.
+    """
+
+    async def commit(self):
+        business_id = self.info.get("business_id")
+
+        if business_id is not None and self.in_transaction():
+            await self.execute(
+                text("SELECT pg_advisory_xact_lock_shared(:key)"),
+                {"key": fence_key(business_id)},
+            )
+
+            if await shard_router.current_shard(business_id) != self.info["shard"]:
+                await self.rollback()
+                raise BusinessShardMoving()
+
+        await super().commit()
+
+
+class ShardRouter:
+    """Routes business scoped queries to the database holding the business.
+
+    Shards are listed in SHARD_DATABASE_URLS. Businesses live on the default
+    shard unless SHARD_MAP or the redis shard map says otherwise. The map is
+    kept in process and refreshed when its version counter moves, so routing
+    a request costs a dict lookup.
+    """
+
+    def __init__(self, urls: Dict[str, str], pinned: Dict[str, str]):
+        self.urls = {DEFAULT_SHARD: Config.DATABASE_URL, **urls}
+        self.pinned = dict(pinned)
+        self.directory: Mapping[str, str] = MappingProxyType(self.pinned)
+        self.version = -1
+        self._engines: Dict[str, AsyncEngine] = {DEFAULT_SHARD: engine}
+        self._sessions: Dict[str, sessionmaker] = {DEFAULT_SHARD: async_session}
+
+    @property
+    def shards(self) -> List[str]:
+        return list(self.urls)
+
+    def get_engine(self, shard: str) -> AsyncEngine:
+        if shard not in self._engines:
+            shard_engine = AsyncEngine(create_engine(url=self.urls[shard], echo=True))
+            instrument_engine(shard_engine)
+            watch_queries(shard_engine)
+            self._engines[shard] = shard_engine
+
+        return self._engines[shard]
+
+    def get_sessionmaker(self, shard: str) -> sessionmaker:
+        if shard not in self._sessions:
+            self._sessions[shard] = sessionmaker(
+                bind=self.get_engine(shard), class_=AsyncSession, expire_on_commit=False
+            )
+
+        return self._sessions[shard]
+
+    def shard_for(self, business_id: uuid.UUID | str) -> str:
+        # with several shards, guessing before the redis map has loaded could
+        # write a moved business's rows to the wrong database
+        if self.version < 0 and len(self.urls) > 1:
+            raise BusinessShardMoving()
+
+        shard = self.directory.get(str(business_id), DEFAULT_SHARD)
+
+        if shard == MOVING:
+            raise BusinessShardMoving()
+
+        return shard
+
+    def session(self, business_id: uuid.UUID | str) -> AsyncSession:
+        shard = self.shard_for(business_id)
+
+        return ShardSession(
+            bind=self.get_engine(shard),
+            expire_on_commit=False,
+            info={"business_id": str(business_id), "shard": shard},
+        )
+
+    async def current_shard(self, business_id: uuid.UUID | str) -> str:
+        # read through to redis, the in-process directory may lag a move
+        shard = await get_async_store().hget(SHARD_MAP_KEY, str(business_id))
+
+        if shard is not None:
+            return shard.decode()
+
+        return self.pinned.get(str(business_id), DEFAULT_SHARD)
+
+    async def get_version(self) -> int:
+        version = await get_async_store().get(SHARD_MAP_VERSION_KEY)
+
+        return int(version) if version else 0
+
+    async def refresh(self, version: int | None = None):
+        if version is None:
+            version = await self.get_version()
+
+        overrides = await get_async_store().hgetall(SHARD_MAP_KEY)
+
+        directory = dict(self.pinned)
+        directory.update({k.decode(): v.decode() for k, v in overrides.items()})
+
+        unknown = set(directory.values()) - set(self.urls) - {MOVING}
+        if unknown:
+            logger.error("shard map names unconfigured shards %s", sorted(unknown))
+
+        self.directory = MappingProxyType(directory)
+        self.version = version
+
+    async def run_poller(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+
+            try:
+                version = await self.get_version()
+
+                if version != self.version:
+                    await self.refresh(version)
+            except Exception as e:
+                logger.exception(e)
+
+    async def set_shard(self, business_id: uuid.UUID | str, shard: str):
+        store = get_async_store()
+        await store.hset(SHARD_MAP_KEY, str(business_id), shard)
+        await store.incr(SHARD_MAP_VERSION_KEY)
+
+    async def dispose(self):
+        # the default engine is disposed with the rest of the app resources
+        for shard, shard_engine in self._engines.items():
+            if shard != DEFAULT_SHARD:
+                await shard_engine.dispose()
+
+
+shard_router = ShardRouter(Config.SHARD_DATABASE_URLS, Config.SHARD_MAP)
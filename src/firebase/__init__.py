@@ -1,18 +1,41 @@
-import firebase_admin
-from firebase_admin import credentials, auth
 import pathlib
+from functools import lru_cache
 
+from src.common.tracing import traced
 from src.firebase.schema import IDVerificationResponse
 
-cred = credentials.Certificate(pathlib.Path(__file__).parent / "service_account.json")
 
-firebase_app = firebase_admin.initialize_app(cred)
+@lru_cache(maxsize=None)
+def get_firebase_app():
+    # the admin SDK is heavy and reads credentials, so load it on first use
+    import firebase_admin
+    from firebase_admin import credentials
 
+    cred = credentials.Certificate(
+        pathlib.Path(__file__).parent / "service_account.json"
+    )
 
+    return firebase_admin.initialize_app(cred)
+
+
+def close_firebase_app():
+    if not get_firebase_app.cache_info().currsize:
+        return
+
+    import firebase_admin
+
+    firebase_admin.delete_app(get_firebase_app())
+    get_firebase_app.cache_clear()
+
+
+@traced("firebase.verify_id_token")
 def verify_id_token(
     id_token: str, return_detail: bool = False
 ) -> IDVerificationResponse:
+    from firebase_admin import auth
+
     try:
+        firebase_app = get_firebase_app()
         decoded_token = auth.verify_id_token(id_token=id_token, app=firebase_app)
 
         uid = decoded_token["uid"]
@@ -20,7 +43,7 @@ def verify_id_token(
         if not return_detail:
             return IDVerificationResponse(is_valid=True)
 
-        user_data = auth.get_user(uid)
+        user_data = auth.get_user(uid, app=firebase_app)
 
         result = user_data.__dict__.get("_data")
 
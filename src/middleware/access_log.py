@@ -0,0 +1,106 @@
+import json
+import logging
+import queue
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.common.metrics import REQUEST_COUNT, REQUEST_LATENCY
+from src.config.settings import Config
+
+access_logger = logging.getLogger("corpman.access")
+
+
+class AccessLogFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record.access, default=str)
+
+
+class AccessQueueHandler(QueueHandler):
+    # records only ever cross threads inside this process, so the copy and
+    # message formatting QueueHandler does for pickling are skipped
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_access_log() -> QueueListener:
+    """Route access records through a queue, returning its unstarted listener.
+
+    The listener is started from the lifespan, inside each worker, because
+    its thread would not survive a fork of a preloaded app.
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(AccessLogFormatter())
+
+    access_logger.addHandler(AccessQueueHandler(log_queue))
+    access_logger.setLevel(logging.INFO)
+    access_logger.propagate = False
+
+    return QueueListener(log_queue, stream_handler)
+
+
+class AccessLogMiddleware:
+    """Times each request with perf_counter and queues a structured record.
+
+    All errors and slow requests are logged. Other requests are sampled at
+    ``ACCESS_LOG_SAMPLE_RATE``.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.sample_rate = Config.ACCESS_LOG_SAMPLE_RATE
+        self.slow_ms = Config.ACCESS_LOG_SLOW_MS
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - started
+            duration_ms = duration * 1000
+            route = scope.get("route")
+            # unmatched paths share one label to keep series cardinality bounded
+            route_path = getattr(route, "path", "unmatched")
+
+            REQUEST_COUNT.labels(scope["method"], route_path, status_code).inc()
+            REQUEST_LATENCY.labels(scope["method"], route_path).observe(duration)
+
+            if (
+                status_code >= 400
+                or duration_ms >= self.slow_ms
+                or random.random() < self.sample_rate
+            ):
+                client = scope.get("client") or ("", 0)
+
+                access_logger.info(
+                    "request",
+                    extra={
+                        "access": {
+                            "ts": datetime.now(timezone.utc).isoformat(),
+                            "client": f"{client[0]}:{client[1]}",
+                            "method": scope["method"],
+                            "path": scope["path"],
+                            "route": route_path,
+                            "status": status_code,
+                            "duration_ms": round(duration_ms, 3),
+                            "slow": duration_ms >= self.slow_ms,
+                        }
+                    },
+                )
@@ -0,0 +1,27 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.common.mail import request_mails, settle_abandoned_mails
+
+
+class MailQueueMiddleware:
+    """Uncounts queued mails whose background task never ran.
+
+    Background tasks run inside the response, so once the app returns every
+    mail the request queued has either been sent or was dropped with it.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        mails = []
+        token = request_mails.set(mails)
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_mails.reset(token)
+            settle_abandoned_mails(mails)
@@ -1,28 +1,35 @@
 from fastapi import FastAPI
-from fastapi.requests import Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-import time
 import logging
 
+from src.common.tracing import TracingMiddleware
+from src.config.lifecycle import DrainMiddleware
+from src.config.settings import Config
+from .access_log import AccessLogMiddleware, setup_access_log
+from .mail_queue import MailQueueMiddleware
+from .query_stats import QueryStatsMiddleware
+
+# AccessLogMiddleware replaces uvicorn's access log
 logger = logging.getLogger("uvicorn.access")
 logger.disabled = True
 
 
 def register_middleware(app: FastAPI):
 
-    @app.middleware("http")
-    async def custom_logging(request: Request, call_next):
-        start_time = time.time()
+    app.state.access_log_listener = setup_access_log()
+
+    # requests are only inspected for profiling when it is switched on
+    if Config.PROFILING_ENABLED:
+        from .profiling import ProfilingMiddleware
 
-        response = await call_next(request)
-        processing_time = time.time() - start_time
+        app.add_middleware(ProfilingMiddleware)
 
-        message = f"{request.client.host}:{request.client.port} - {request.method} - {request.url.path} - {response.status_code} completed after {processing_time}s"
+    app.add_middleware(QueryStatsMiddleware)
 
-        print(message)
+    app.add_middleware(MailQueueMiddleware)
 
-        return response
+    app.add_middleware(AccessLogMiddleware)
 
     app.add_middleware(
         CORSMiddleware,
@@ -32,6 +39,9 @@ def register_middleware(app: FastAPI):
         allow_credentials=True,
     )
 
+    if Config.TRACING_ENABLED:
+        app.add_middleware(TracingMiddleware)
+
     app.add_middleware(
         TrustedHostMiddleware,
         allowed_hosts=[
@@ -41,3 +51,6 @@ def register_middleware(app: FastAPI):
             "0.0.0.0",
         ],
     )
+
+    # outermost so requests arriving during shutdown are refused before any work
+    app.add_middleware(DrainMiddleware)
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import os
+import random
+import re
+import time
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.config.db import async_session
+from src.config.settings import Config
+from src.modules.auth.dependencies import RoleChecker, auth_service, redis_service
+from src.modules.auth.utils import decode_access_token
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_FORMATS = {"html", "speedscope"}
+
+admin_checker = RoleChecker(["admin", "root"])
+
+
+class ProfilingMiddleware:
+    """Profiles single requests with pyinstrument and writes the report to disk.
+
+    A request is profiled when an admin sends the ``X-Profile`` header (its
+    value picks ``html`` or ``speedscope`` output) or when it falls in the
+    ``PROFILE_SAMPLE_RATE`` random sample. The middleware is only installed
+    when ``PROFILING_ENABLED`` is set.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.sample_rate = Config.PROFILE_SAMPLE_RATE
+        self.directory = Config.PROFILE_DIR
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        requested = None
+        authorization = None
+
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                requested = value.decode().lower()
+            elif name == b"authorization":
+                authorization = value.decode()
+
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+
+        if not sampled and (
+            requested is None or not await self.is_admin(authorization)
+        ):
+            return await self.app(scope, receive, send)
+
+        from pyinstrument import Profiler
+
+        profiler = Profiler(async_mode="enabled")
+        profiler.start()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.stop()
+
+            output = (
+                requested if requested in PROFILE_FORMATS else Config.PROFILE_FORMAT
+            )
+            await asyncio.to_thread(self.save, profiler, scope, output)
+
+    async def is_admin(self, authorization: str | None) -> bool:
+        if not authorization or not authorization.lower().startswith("bearer "):
+            return False
+
+        token_data = decode_access_token(authorization[7:])
+
+        if (
+            not token_data
+            or token_data["refresh"]
+            or token_data["isTemp"]
+            or redis_service.token_in_blocklist(
+                token_data["jti"], token_data["exp"]
+            )
+        ):
+            return False
+
+        async with async_session() as session:
+            user = await auth_service.get_user_by_email(
+                token_data["user"]["email"], session
+            )
+
+        try:
+            await admin_checker(user)
+        except Exception:
+            return False
+
+        return True
+
+    def save(self, profiler, scope: Scope, output: str):
+        path = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        filename = f"{time.strftime('%Y%m%d-%H%M%S')}_{scope['method']}_{path}"
+
+        if output == "speedscope":
+            from pyinstrument.renderers import SpeedscopeRenderer
+
+            filename = f"{filename}.speedscope.json"
+            content = profiler.output(renderer=SpeedscopeRenderer())
+        else:
+            filename = f"{filename}.html"
+            content = profiler.output_html()
+
+        with open(os.path.join(self.directory, filename), "w") as file:
+            file.write(content)
+
+        logger.info("request profile written to %s", filename)
@@ -0,0 +1,63 @@
+import logging
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.common.metrics import (
+    DB_QUERIES_PER_REQUEST,
+    DB_TIME_PER_REQUEST,
+    N_PLUS_ONE_REQUESTS,
+)
+from src.config.db import QueryStats, query_stats, query_stats_observers
+from src.config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStatsMiddleware:
+    """Counts the SQL statements each request issues.
+
+    In development the totals are returned as ``X-DB-*`` response headers.
+    Elsewhere they are recorded as per-route metrics.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.headers = Config.ENVIRONMENT == "development"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = QueryStats()
+        token = query_stats.set(stats)
+
+        async def send_wrapper(message: Message):
+            if self.headers and message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Query-Count"] = str(stats.count)
+                headers["X-DB-Time-Ms"] = f"{stats.duration * 1000:.2f}"
+                headers["X-DB-N-Plus-One"] = str(len(stats.n_plus_one))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            query_stats.reset(token)
+
+            route = getattr(scope.get("route"), "path", "unmatched")
+            repeated = stats.n_plus_one
+
+            if repeated:
+                logger.warning(
+                    "possible N+1 on %s %s: %s", scope["method"], route, repeated
+                )
+
+            if not self.headers:
+                DB_QUERIES_PER_REQUEST.labels(route).observe(stats.count)
+                DB_TIME_PER_REQUEST.labels(route).observe(stats.duration)
+                if repeated:
+                    N_PLUS_ONE_REQUESTS.labels(route).inc()
+
+            for observer in query_stats_observers:
+                observer(scope["method"], route, stats)
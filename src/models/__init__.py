@@ -1,11 +1,23 @@
 import uuid
 from datetime import datetime
+from decimal import Decimal
 from typing import List, Optional
 import sqlalchemy.dialects.postgresql as pg
+from sqlalchemy import Index, UniqueConstraint, func, literal_column, text
+from sqlalchemy.types import UserDefinedType
 from sqlmodel import Column, Field, Relationship, SQLModel
 from src.common.enums import *
 
 
+class XID8(UserDefinedType):
+    """Postgres 64-bit transaction id, compared to snapshot horizons."""
+
+    cache_ok = True
+
+    def get_col_spec(self, **kw):
+        return "XID8"
+
+
 class AppModules(SQLModel, table=True):
     __tablename__ = "app_modules"
     id: uuid.UUID = Field(
@@ -84,6 +96,9 @@ class AuthMetaData(SQLModel, table=True):
     uid: uuid.UUID = Field(
         sa_column=Column(pg.UUID, nullable=False, primary_key=True, default=uuid.uuid4)
     )
+    user_id: Optional[uuid.UUID] = Field(
+        default=None, nullable=True, foreign_key="users.uid", index=True
+    )
     device_ip: str = Field(sa_column=Column(pg.VARCHAR, nullable=False))
     device_name: str = Field(sa_column=Column(pg.VARCHAR, nullable=False))
     device_os: str = Field(sa_column=Column(pg.VARCHAR, nullable=False))
@@ -252,6 +267,41 @@ class Customer(SQLModel, table=True):
         return f"<Customer {self.id}>"
 
 
+# literal arguments so queries render the exact expression the index was built on
+customer_phone_digits = func.regexp_replace(
+    Customer.phone, literal_column(r"'\D'"), literal_column("''"), literal_column("'g'")
+)
+customer_email_lower = func.lower(Customer.email)
+
+Index("ix_customers_business_id", Customer.business_id)
+Index(
+    "ix_customers_first_name_trgm",
+    Customer.first_name,
+    postgresql_using="gin",
+    postgresql_ops={"first_name": "gin_trgm_ops"},
+)
+Index(
+    "ix_customers_last_name_trgm",
+    Customer.last_name,
+    postgresql_using="gin",
+    postgresql_ops={"last_name": "gin_trgm_ops"},
+)
+Index(
+    "ix_customers_email_trgm",
+    Customer.email,
+    postgresql_using="gin",
+    postgresql_ops={"email": "gin_trgm_ops"},
+)
+Index(
+    "ix_customers_phone_digits_trgm",
+    customer_phone_digits.label("phone_digits"),
+    postgresql_using="gin",
+    postgresql_ops={"phone_digits": "gin_trgm_ops"},
+)
+Index("ix_customers_business_email_lower", Customer.business_id, customer_email_lower)
+Index("ix_customers_business_phone_digits", Customer.business_id, customer_phone_digits)
+
+
 class Wallet(SQLModel, table=True):
     __tablename__ = "wallets"
     id: uuid.UUID = Field(
@@ -382,3 +432,100 @@ class TransactionApproval(SQLModel, table=True):
 
     def __repr__(self):
         return f"<TransactionApproval {self.id}>"
+
+
+class LedgerAccount(SQLModel, table=True):
+    __tablename__ = "ledger_accounts"
+    __table_args__ = (UniqueConstraint("business_id", "code"),)
+    id: uuid.UUID = Field(
+        sa_column=Column(pg.UUID, nullable=False, primary_key=True, default=uuid.uuid4)
+    )
+    business_id: uuid.UUID = Field(nullable=False, foreign_key="businesses.id")
+    code: str = Field(sa_column=Column(pg.VARCHAR, nullable=False))
+    created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
+
+    def __repr__(self):
+        return f"<LedgerAccount {self.id}>"
+
+
+class JournalEntry(SQLModel, table=True):
+    __tablename__ = "journal_entries"
+    id: uuid.UUID = Field(
+        sa_column=Column(pg.UUID, nullable=False, primary_key=True, default=uuid.uuid4)
+    )
+    business_id: uuid.UUID = Field(nullable=False, foreign_key="businesses.id")
+    transaction_id: Optional[uuid.UUID] = Field(
+        default=None, nullable=True, foreign_key="transactions.id", index=True
+    )
+    description: str = Field(sa_column=Column(pg.VARCHAR, nullable=True))
+    created_at: datetime = Field(
+        sa_column=Column(pg.TIMESTAMP, nullable=False, default=datetime.now)
+    )
+
+    def __repr__(self):
+        return f"<JournalEntry {self.id}>"
+
+
+class Posting(SQLModel, table=True):
+    __tablename__ = "ledger_postings"
+    __table_args__ = (
+        Index("ix_ledger_postings_account_created", "account_id", "created_at"),
+        Index("ix_ledger_postings_account_xact", "account_id", "xact_id"),
+    )
+    id: int = Field(sa_column=Column(pg.BIGINT, primary_key=True, autoincrement=True))
+    entry_id: uuid.UUID = Field(nullable=False, foreign_key="journal_entries.id")
+    account_id: uuid.UUID = Field(nullable=False, foreign_key="ledger_accounts.id")
+    # debits are positive and credits negative, so every entry sums to zero
+    amount: Decimal = Field(sa_column=Column(pg.NUMERIC(20, 4), nullable=False))
+    # the writing transaction, so snapshots can tell which postings are final
+    xact_id: int = Field(
+        sa_column=Column(
+            XID8, nullable=False, server_default=text("pg_current_xact_id()")
+        )
+    )
+    created_at: datetime = Field(
+        sa_column=Column(pg.TIMESTAMP, nullable=False, default=datetime.now)
+    )
+
+    def __repr__(self):
+        return f"<Posting {self.id}>"
+
+
+class BalanceSnapshot(SQLModel, table=True):
+    __tablename__ = "ledger_balance_snapshots"
+    __table_args__ = (
+        Index("ix_ledger_balance_snapshots_account_as_of", "account_id", "as_of"),
+    )
+    id: int = Field(sa_column=Column(pg.BIGINT, primary_key=True, autoincrement=True))
+    account_id: uuid.UUID = Field(nullable=False, foreign_key="ledger_accounts.id")
+    balance: Decimal = Field(sa_column=Column(pg.NUMERIC(20, 4), nullable=False))
+    as_of: datetime = Field(sa_column=Column(pg.TIMESTAMP, nullable=False))
+    # covers exactly the postings whose xact_id is below this horizon
+    xact_horizon: int = Field(sa_column=Column(XID8, nullable=False))
+    created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
+
+    def __repr__(self):
+        return f"<BalanceSnapshot {self.id}>"
+
+
+class LoginEvent(SQLModel, table=True):
+    __tablename__ = "login_events"
+    __table_args__ = (Index("ix_login_events_user_created", "user_id", "created_at"),)
+    id: int = Field(sa_column=Column(pg.BIGINT, primary_key=True, autoincrement=True))
+    # no foreign key, history rows are written in bulk and outlive their users
+    user_id: Optional[uuid.UUID] = Field(default=None, nullable=True)
+    session_id: Optional[uuid.UUID] = Field(default=None, nullable=True)
+    event: str = Field(sa_column=Column(pg.VARCHAR, nullable=False))
+    email: str = Field(sa_column=Column(pg.VARCHAR, nullable=True))
+    device_ip: str = Field(sa_column=Column(pg.VARCHAR, nullable=True))
+    device_name: str = Field(sa_column=Column(pg.VARCHAR, nullable=True))
+    device_os: str = Field(sa_column=Column(pg.VARCHAR, nullable=True))
+    device_browser: str = Field(sa_column=Column(pg.VARCHAR, nullable=True))
+    timezone: str = Field(sa_column=Column(pg.VARCHAR, nullable=True))
+    user_agent: str = Field(sa_column=Column(pg.VARCHAR, nullable=True))
+    created_at: datetime = Field(
+        sa_column=Column(pg.TIMESTAMP, nullable=False, default=datetime.now)
+    )
+
+    def __repr__(self):
+        return f"<LoginEvent {self.id}>"
@@ -1,8 +1,60 @@
-from fastapi import APIRouter, status
+import uuid
+
+from fastapi import APIRouter, Depends, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.common.utilities import response
+from src.config import get_session
+from src.modules.auth.dependencies import PermissionChecker
+from .schemas import AppConfigUpdateModel, AppModuleUpdateModel
+from .service import app_config_service
 
 
 admin_router = APIRouter()
 
 @admin_router.get("", status_code=status.HTTP_200_OK)
 async def get_admins():
-    pass
\ No newline at end of file
+    pass
+
+
+@admin_router.get("/config", status_code=status.HTTP_200_OK)
+async def get_app_config():
+    snapshot = app_config_service.snapshot
+
+    return response(
+        data={
+            "version": snapshot.version,
+            "config": dict(snapshot.config),
+            "modules": [module.model_dump() for module in snapshot.modules.values()],
+        }
+    )
+
+
+@admin_router.put(
+    "/config/{name}",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(PermissionChecker("app_config:write"))],
+)
+async def set_app_config(
+    name: str,
+    data: AppConfigUpdateModel,
+    session: AsyncSession = Depends(get_session),
+):
+    config = await app_config_service.set_config(name, data, session)
+
+    return response(message="Config updated", data=config)
+
+
+@admin_router.patch(
+    "/modules/{module_id}",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(PermissionChecker("app_config:write"))],
+)
+async def update_app_module(
+    module_id: uuid.UUID,
+    data: AppModuleUpdateModel,
+    session: AsyncSession = Depends(get_session),
+):
+    module = await app_config_service.update_module(module_id, data, session)
+
+    return response(message="Module updated", data=module)
@@ -0,0 +1,36 @@
+import uuid
+from types import MappingProxyType
+from typing import List, Mapping, Optional, Tuple
+
+from pydantic import BaseModel, ConfigDict
+
+
+class AppModuleSnapshot(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    id: uuid.UUID
+    name: str
+    description: Optional[str] = None
+    permissions: Tuple[str, ...] = ()
+    is_active: bool = True
+
+
+class AppConfigSnapshot(BaseModel):
+    """Read-only view of the app_config and app_modules tables."""
+
+    model_config = ConfigDict(frozen=True, arbitrary_types_allowed=True)
+
+    version: int
+    config: Mapping[str, str] = MappingProxyType({})
+    modules: Mapping[str, AppModuleSnapshot] = MappingProxyType({})
+
+
+class AppConfigUpdateModel(BaseModel):
+    value: str
+    description: Optional[str] = None
+
+
+class AppModuleUpdateModel(BaseModel):
+    description: Optional[str] = None
+    permissions: Optional[List[str]] = None
+    is_active: Optional[bool] = None
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+from types import MappingProxyType
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.common.errors import AppModuleNotFound
+from src.config.db import async_session
+from src.config.redis import get_async_store
+from src.models import AppConfig, AppModules
+from .schemas import (
+    AppConfigSnapshot,
+    AppConfigUpdateModel,
+    AppModuleSnapshot,
+    AppModuleUpdateModel,
+)
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "app_config:version"
+
+
+class AppConfigService:
+    """Serves app config and modules from an in-process snapshot.
+
+    Writes bump a version counter in Redis. Every worker polls the counter
+    and swaps in a freshly loaded snapshot when it moves, so reads never
+    touch the database or Redis.
+    """
+
+    def __init__(self):
+        self.snapshot = AppConfigSnapshot(version=-1)
+        self._lock = asyncio.Lock()
+
+    def get(self, name: str, default: str | None = None) -> str | None:
+        return self.snapshot.config.get(name, default)
+
+    def get_module(self, name: str) -> AppModuleSnapshot | None:
+        return self.snapshot.modules.get(name)
+
+    async def get_version(self) -> int:
+        version = await get_async_store().get(VERSION_KEY)
+
+        return int(version) if version else 0
+
+    async def refresh(self, version: int | None = None):
+        async with self._lock:
+            # the version is read before the tables so a write that lands in
+            # between moves the counter past this snapshot and is picked up next poll
+            if version is None:
+                version = await self.get_version()
+
+            if version == self.snapshot.version:
+                return
+
+            async with async_session() as session:
+                configs = await session.exec(select(AppConfig))
+                modules = await session.exec(select(AppModules))
+
+                config = {c.name: c.value for c in configs.all()}
+                module_snapshots = {
+                    m.name: AppModuleSnapshot(
+                        id=m.id,
+                        name=m.name,
+                        description=m.description,
+                        permissions=tuple(m.permissions or ()),
+                        is_active=m.is_active is not False,
+                    )
+                    for m in modules.all()
+                }
+
+            # a single attribute assignment, readers see the old or new snapshot whole
+            self.snapshot = AppConfigSnapshot(
+                version=version,
+                config=MappingProxyType(config),
+                modules=MappingProxyType(module_snapshots),
+            )
+            logger.info("app config snapshot loaded version=%d", version)
+
+    async def run_poller(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+
+            try:
+                version = await self.get_version()
+
+                if version != self.snapshot.version:
+                    await self.refresh(version)
+            except Exception as e:
+                logger.exception(e)
+
+    async def bump_version(self):
+        version = await get_async_store().incr(VERSION_KEY)
+        await self.refresh(version)
+
+    async def set_config(
+        self, name: str, data: AppConfigUpdateModel, session: AsyncSession
+    ) -> AppConfig:
+        result = await session.exec(select(AppConfig).where(AppConfig.name == name))
+        config = result.first()
+
+        if config is None:
+            config = AppConfig(id=uuid.uuid4(), name=name, created_at=datetime.now())
+
+        config.value = data.value
+
+        if data.description is not None:
+            config.description = data.description
+
+        session.add(config)
+        await session.commit()
+        await self.bump_version()
+
+        return config
+
+    async def update_module(
+        self, module_id: uuid.UUID, data: AppModuleUpdateModel, session: AsyncSession
+    ) -> AppModules:
+        module = await session.get(AppModules, module_id)
+
+        if module is None:
+            raise AppModuleNotFound()
+
+        for key, value in data.model_dump(exclude_none=True).items():
+            setattr(module, key, value)
+
+        session.add(module)
+        await session.commit()
+        await self.bump_version()
+
+        return module
+
+
+app_config_service = AppConfigService()
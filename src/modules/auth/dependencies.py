@@ -1,16 +1,20 @@
-from typing import List, Optional
+from typing import AsyncGenerator, Iterable, List, Optional
 from fastapi import Depends, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
-from src.config.db import get_session
+from src.config.db import QueryStats, get_session, query_stats
+from src.config.shards import shard_router
 from src.config import RedisService
 from src.models import User
 
+from .permissions import MODULE_BITS, PERMISSION_BITS, encode
+from .sessions import session_store
 from .utils import decode_access_token
 from sqlmodel.ext.asyncio.session import AsyncSession
 from .service import AuthService
 from src.common.errors import (
     AccountNotVerified,
+    BusinessNotFound,
     InvalidToken,
     RevokedToken,
     AccessTokenRequired,
@@ -40,11 +44,20 @@ class TokenBearer(HTTPBearer):
             raise InvalidToken()
         token_data = decode_access_token(creds.credentials)
 
-        in_blocklist = redis_service.token_in_blocklist(jti=token_data["jti"])
+        in_blocklist = redis_service.token_in_blocklist(
+            jti=token_data["jti"], exp=token_data["exp"]
+        )
 
         if in_blocklist:
             raise RevokedToken()
 
+        # logged out devices and revoke-all drop the session from the store
+        session_id = token_data.get("session_id")
+        if session_id and not await session_store.is_active(
+            token_data["user"]["uid"], session_id
+        ):
+            raise RevokedToken()
+
         self.verify_token(token_data)
 
         return token_data
@@ -103,6 +116,23 @@ async def get_current_user(
     return user
 
 
+async def get_business_session(
+    user: User = Depends(get_current_user),
+) -> AsyncGenerator[AsyncSession, None]:
+    """Session on the shard that holds the current user's business."""
+    if not user.business_id:
+        raise BusinessNotFound()
+
+    token = query_stats.set(QueryStats()) if query_stats.get() is None else None
+
+    try:
+        async with shard_router.session(user.business_id) as session:
+            yield session
+    finally:
+        if token is not None:
+            query_stats.reset(token)
+
+
 class RoleChecker:
     def __init__(self, allowed_roles: List[str]):
         self.allowed_roles = allowed_roles
@@ -116,3 +146,33 @@ class RoleChecker:
             raise InsufficientPermission()
 
         return user
+
+
+class PermissionChecker:
+    """Authorizes from the token's bitmasks, without touching the database.
+
+    Masks are fixed when the token is issued, so permission changes apply
+    once the client refreshes its access token.
+    """
+
+    def __init__(self, *permissions: str, modules: Iterable[str] = ()):
+        unknown = [p for p in permissions if p not in PERMISSION_BITS]
+        unknown += [m for m in modules if m not in MODULE_BITS]
+
+        if unknown:
+            raise ValueError(f"unregistered permissions or modules: {unknown}")
+
+        self.required_permissions = encode(permissions, PERMISSION_BITS)
+        self.required_modules = encode(modules, MODULE_BITS)
+
+    async def __call__(self, token_data: dict = Depends(AcessTokenBearer())) -> dict:
+        perms = token_data.get("perms", 0)
+        mods = token_data.get("mods", 0)
+
+        if perms & self.required_permissions != self.required_permissions:
+            raise InsufficientPermission()
+
+        if mods & self.required_modules != self.required_modules:
+            raise InsufficientPermission()
+
+        return token_data
@@ -0,0 +1,35 @@
+import uuid
+from datetime import datetime
+
+from fastapi import Request
+
+from src.common.event_buffer import EventBuffer
+from src.config.settings import Config
+from src.models import LoginEvent
+from .sessions import describe_device
+
+login_events = EventBuffer(
+    "login_events",
+    LoginEvent.__table__,
+    batch_size=Config.LOGIN_EVENT_BATCH_SIZE,
+    flush_timeout=Config.LOGIN_EVENT_FLUSH_TIMEOUT,
+)
+
+
+def record_login(
+    request: Request,
+    event: str,
+    email: str,
+    user_id: uuid.UUID | None = None,
+    session_id: str | None = None,
+):
+    login_events.add(
+        {
+            "user_id": user_id,
+            "session_id": session_id,
+            "event": event,
+            "email": email,
+            **describe_device(request),
+            "created_at": datetime.now(),
+        }
+    )
@@ -0,0 +1,58 @@
+from typing import Iterable, Tuple
+
+from src.common.enums import UserTypeEnum
+
+# Bit positions are baked into issued tokens: only ever append to these
+# tuples, never reorder or remove an entry while its tokens can be live.
+PERMISSIONS: Tuple[str, ...] = (
+    "customers:read",
+    "customers:write",
+    "transactions:read",
+    "transactions:write",
+    "transactions:approve",
+    "ledger:read",
+    "assets:read",
+    "assets:write",
+    "app_config:write",
+)
+
+MODULES: Tuple[str, ...] = (
+    "customers",
+    "transactions",
+    "ledger",
+    "assets",
+    "loans",
+)
+
+PERMISSION_BITS = {name: 1 << i for i, name in enumerate(PERMISSIONS)}
+MODULE_BITS = {name: 1 << i for i, name in enumerate(MODULES)}
+
+ALL_PERMISSIONS = (1 << len(PERMISSIONS)) - 1
+
+# roles that hold every permission regardless of their permissions column
+SUPER_ROLES = {UserTypeEnum.root.value, UserTypeEnum.admin.value}
+
+
+def encode(names: Iterable[str] | None, bits: dict) -> int:
+    """Fold names into a mask, ignoring any the registry does not know."""
+    mask = 0
+
+    for name in names or ():
+        mask |= bits.get(name, 0)
+
+    return mask
+
+
+def decode(mask: int, registry: Tuple[str, ...]) -> list[str]:
+    return [name for i, name in enumerate(registry) if mask >> i & 1]
+
+
+def permission_mask(role: str | None, permissions: Iterable[str] | None) -> int:
+    if role in SUPER_ROLES:
+        return ALL_PERMISSIONS
+
+    return encode(permissions, PERMISSION_BITS)
+
+
+def module_mask(modules: Iterable[str] | None) -> int:
+    return encode(modules, MODULE_BITS)
@@ -7,6 +7,7 @@ from fastapi import (
     templating,
 )
 from fastapi.responses import JSONResponse
+from src.common.responses import FastJSONResponse
 
 from src.common.utilities import generate_random_numbers, response
 from src.config import RedisService
@@ -26,16 +27,18 @@ from .schemas import (
     UserLoginModel,
 )
 from .service import AuthService
+from .events import record_login
+from .sessions import session_store
 from src.config import get_session
 from sqlalchemy.ext.asyncio import AsyncSession
 from .utils import (
     create_access_token,
     decode_access_token,
-    generate_uuid,
-    verify_password,
-    get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
 )
 from .dependencies import RefreshTokenBearer, AcessTokenBearer, get_current_user
+from src.common.rate_limit import RateLimiter
 from src.common.errors import (
     InvalidCredentials,
     PasswordAlreadySet,
@@ -45,7 +48,7 @@ from src.common.errors import (
     UserNotFound,
 )
 from src.config.settings import Config
-from src.common.mail import sendMail, MailData
+from src.common.mail import enqueue_mail, MailData
 
 
 auth_router = APIRouter()
@@ -81,8 +84,8 @@ async def create_user_account(
         <p style="text-align: center; font-weight: bold;">{code}</p>
     """
 
-    bg_task.add_task(
-        sendMail, MailData(recipients=[email], subject="Welcome", message=html)
+    enqueue_mail(
+        bg_task, MailData(recipients=[email], subject="Welcome", message=html)
     )
     # sendMail(MailData(recipients=[email], subject="Welcome", message=html))
 
@@ -97,6 +100,7 @@ async def create_user_account(
 @auth_router.post(
     "/resend-verification",
     status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(RateLimiter("resend-verification", identifier_field="email"))],
 )
 async def resend_email_verification_code(
     data: ResendVerificationCodeModel,
@@ -121,8 +125,8 @@ async def resend_email_verification_code(
         <p style="text-align: center; font-weight: bold;">{code}</p>
     """
 
-    bg_task.add_task(
-        sendMail, MailData(recipients=[email], subject="Verification", message=html)
+    enqueue_mail(
+        bg_task, MailData(recipients=[email], subject="Verification", message=html)
     )
     # sendMail(MailData(recipients=[email], subject="Welcome", message=html))
 
@@ -135,7 +139,9 @@ async def resend_email_verification_code(
 
 @auth_router.post("/verify-email", status_code=status.HTTP_200_OK)
 async def verify_user_account(
-    data: EmailVerificationModel, session: AsyncSession = Depends(get_session)
+    data: EmailVerificationModel,
+    request: Request,
+    session: AsyncSession = Depends(get_session),
 ):
 
     user_email = data.email
@@ -157,14 +163,18 @@ async def verify_user_account(
         user=user, user_data={"is_email_verified": True}, session=session
     )
 
+    token_user = {
+        "email": user_email,
+        "uid": str(user.uid),
+        "role": user.role,
+        "session_id": await session_store.create(user.uid, request),
+    }
+
     access_token = create_access_token(
-        data={"email": user_email, "uid": str(user.uid), "role": user.role}
+        data=token_user, **await user_service.get_token_masks(user, session)
     )
 
-    refresh_token = create_access_token(
-        data={"email": user_email, "uid": str(user.uid), "role": user.role},
-        refresh=True,
-    )
+    refresh_token = create_access_token(data=token_user, refresh=True)
 
     return response(
         status=True,
@@ -177,6 +187,9 @@ async def verify_user_account(
 @auth_router.post(
     "/send-phone-verification-code",
     status_code=status.HTTP_201_CREATED,
+    dependencies=[
+        Depends(RateLimiter("send-phone-verification-code", identifier_field="phone"))
+    ],
 )
 async def send_phone_verification_code(
     data: SendPhoneVerificationCodeModel,
@@ -206,7 +219,9 @@ async def send_phone_verification_code(
 
 @auth_router.post("/verify-phone", status_code=status.HTTP_200_OK)
 async def verify_user_account(
-    data: PhoneVerificationModel, session: AsyncSession = Depends(get_session)
+    data: PhoneVerificationModel,
+    request: Request,
+    session: AsyncSession = Depends(get_session),
 ):
 
     user_phone = data.phone
@@ -228,14 +243,18 @@ async def verify_user_account(
         user=user, user_data={"is_phone_verified": True}, session=session
     )
 
+    token_user = {
+        "email": user.email,
+        "uid": str(user.uid),
+        "role": user.role,
+        "session_id": await session_store.create(user.uid, request),
+    }
+
     access_token = create_access_token(
-        data={"email": user.email, "uid": str(user.uid), "role": user.role}
+        data=token_user, **await user_service.get_token_masks(user, session)
     )
 
-    refresh_token = create_access_token(
-        data={"email": user.email, "uid": str(user.uid), "role": user.role},
-        refresh=True,
-    )
+    refresh_token = create_access_token(data=token_user, refresh=True)
 
     return response(
         status=True,
@@ -263,7 +282,7 @@ async def set_user_password(
     if user.has_password:
         raise PasswordAlreadySet()
 
-    passwd_hash = get_password_hash(new_password)
+    passwd_hash = await get_password_hash_async(new_password)
 
     await user_service.update_user(
         user, {"password_hash": passwd_hash, "has_password": True}, session=session
@@ -275,41 +294,44 @@ async def set_user_password(
 
 
 @auth_router.post(
-    "/login", status_code=status.HTTP_200_OK, response_model=LoginResponseModel
+    "/login",
+    status_code=status.HTTP_200_OK,
+    response_model=LoginResponseModel,
+    dependencies=[Depends(RateLimiter("login", identifier_field="email"))],
 )
 async def login(
-    user_data: UserLoginModel, session: AsyncSession = Depends(get_session)
+    user_data: UserLoginModel,
+    request: Request,
+    session: AsyncSession = Depends(get_session),
 ):
     email = user_data.email
     password = user_data.password
 
     user = await user_service.get_user_by_email(email, session)
 
-    if user is None:
-        raise InvalidCredentials()
-
-    if not user.has_password:
+    if (
+        user is None
+        or not user.has_password
+        or not await verify_password_async(password, user.password_hash)
+    ):
+        record_login(request, "login_failed", email, user.uid if user else None)
         raise InvalidCredentials()
 
-    if not verify_password(password, user.password_hash):
-        raise InvalidCredentials()
+    # the session lives in redis, login no longer writes to the users table
+    token_user = {
+        "email": email,
+        "uid": str(user.uid),
+        "role": user.role,
+        "session_id": await session_store.create(user.uid, request),
+    }
 
-    updated_user = await user_service.update_user(
-        user=user, user_data={"current_session_id": generate_uuid()}, session=session
-    )
+    record_login(request, "login", email, user.uid, token_user["session_id"])
 
     access_token = create_access_token(
-        data={
-            "email": email,
-            "uid": str(user.uid),
-            "role": user.role,
-            "session_id": str(updated_user.current_session_id),
-        }
+        data=token_user, **await user_service.get_token_masks(user, session)
     )
 
-    refresh_token = create_access_token(
-        data={"email": email, "uid": str(user.uid), "role": user.role}, refresh=True
-    )
+    refresh_token = create_access_token(data=token_user, refresh=True)
 
     return response(
         message="Login successful",
@@ -326,7 +348,9 @@ async def login(
 
 @auth_router.post("/socio-auth", status_code=status.HTTP_200_OK)
 async def socio_authentication(
-    data: SocioAuthModel, session: AsyncSession = Depends(get_session)
+    data: SocioAuthModel,
+    request: Request,
+    session: AsyncSession = Depends(get_session),
 ):
     email = data.email
     id_token = data.id_token
@@ -338,20 +362,23 @@ async def socio_authentication(
 
         if socio_user.is_valid:
 
-            access_token = create_access_token(
-                data={
-                    "email": email,
-                    "uid": str(user.uid),
-                    "role": user.role,
-                    "session_id": str(user.current_session_id),
-                }
+            token_user = {
+                "email": email,
+                "uid": str(user.uid),
+                "role": user.role,
+                "session_id": await session_store.create(user.uid, request),
+            }
+
+            record_login(
+                request, "socio_login", email, user.uid, token_user["session_id"]
             )
 
-            refresh_token = create_access_token(
-                data={"email": email, "uid": str(user.uid), "role": user.role},
-                refresh=True,
+            access_token = create_access_token(
+                data=token_user, **await user_service.get_token_masks(user, session)
             )
 
+            refresh_token = create_access_token(data=token_user, refresh=True)
+
             return response(
                 message="Login successful",
                 data={
@@ -376,20 +403,24 @@ async def socio_authentication(
                 session=session,
             )
 
-            access_token = create_access_token(
-                data={
-                    "email": email,
-                    "uid": str(new_user.uid),
-                    "role": new_user.role,
-                    "session_id": str(new_user.current_session_id),
-                }
+            token_user = {
+                "email": email,
+                "uid": str(new_user.uid),
+                "role": new_user.role,
+                "session_id": await session_store.create(new_user.uid, request),
+            }
+
+            record_login(
+                request, "socio_login", email, new_user.uid, token_user["session_id"]
             )
 
-            refresh_token = create_access_token(
-                data={"email": email, "uid": str(new_user.uid), "role": new_user.role},
-                refresh=True,
+            access_token = create_access_token(
+                data=token_user,
+                **await user_service.get_token_masks(new_user, session),
             )
 
+            refresh_token = create_access_token(data=token_user, refresh=True)
+
             return response(
                 message="Login successful",
                 data={
@@ -419,7 +450,12 @@ async def refresh_token(
     if user is None:
         raise InvalidToken()
 
-    access_token = create_access_token(data=token_data["user"], refresh=False)
+    # masks are recomputed so permission changes apply from the next refresh
+    access_token = create_access_token(
+        data=token_data["user"],
+        refresh=False,
+        **await user_service.get_token_masks(user, session),
+    )
 
     return JSONResponse(
         content={"access_token": access_token},
@@ -430,10 +466,13 @@ async def refresh_token(
 @auth_router.get("/me", status_code=status.HTTP_200_OK)
 async def get_current_user(user: dict = Depends(get_current_user)):
 
-    return response(data=user)
+    return FastJSONResponse(response(data=user))
 
 
-@auth_router.post("/forgot-password")
+@auth_router.post(
+    "/forgot-password",
+    dependencies=[Depends(RateLimiter("forgot-password", identifier_field="email"))],
+)
 async def forgot_password(
     email_data: PasswordResetRequestModel, bg_task: BackgroundTasks
 ):
@@ -449,8 +488,8 @@ async def forgot_password(
     <p>Link will expire in 10 minutes</>
     """
 
-    bg_task.add_task(
-        sendMail,
+    enqueue_mail(
+        bg_task,
         MailData(recipients=[email], subject="Reset Your Password", message=html),
     )
 
@@ -468,7 +507,9 @@ async def reset_password_form(request: Request, token: str):
             "error.html", {"request": request, "message": "Invalid or Expired Link"}
         )
 
-    in_blocklist = redis_service.token_in_blocklist(token_data["jti"])
+    in_blocklist = redis_service.token_in_blocklist(
+        token_data["jti"], token_data["exp"]
+    )
 
     if in_blocklist:
         return templates.TemplateResponse(
@@ -508,7 +549,9 @@ async def reset_account_password(
     if not token_data["isTemp"]:
         raise InvalidToken()
 
-    in_blocklist = redis_service.token_in_blocklist(token_data["jti"])
+    in_blocklist = redis_service.token_in_blocklist(
+        token_data["jti"], token_data["exp"]
+    )
 
     if in_blocklist:
         return response(
@@ -525,18 +568,23 @@ async def reset_account_password(
         if not user:
             raise UserNotFound()
 
-        if verify_password(new_password, user.password_hash):
+        if await verify_password_async(new_password, user.password_hash):
             return response(
                 code=status.HTTP_400_BAD_REQUEST,
                 status=False,
                 message="You cannot use your old password",
             )
 
-        passwd_hash = get_password_hash(new_password)
+        passwd_hash = await get_password_hash_async(new_password)
 
         await user_service.update_user(user, {"password_hash": passwd_hash}, session)
 
-        redis_service.add_jti_to_block_list(token_data["jti"])
+        # a reset usually means the old password leaked, sign out every device
+        await session_store.revoke_all(user.uid)
+
+        redis_service.add_jti_to_block_list(
+            token_data["jti"], token_data["exp"]
+        )
 
         return response(message="Password reset Successfully")
 
@@ -549,7 +597,37 @@ async def reset_account_password(
 
 @auth_router.get("/logout", status_code=status.HTTP_200_OK)
 async def logout(token_data: dict = Depends(AcessTokenBearer())):
-    redis_service.add_jti_to_block_list(token_data["jti"])
-    redis_service.remove_store_value_if_exist(token_data["session_id"])
+    # ending the session first signs the device out even if the blocklist
+    # write fails
+    if token_data["session_id"]:
+        await session_store.revoke(
+            token_data["user"]["uid"], token_data["session_id"]
+        )
+
+    redis_service.add_jti_to_block_list(token_data["jti"], token_data["exp"])
 
     return response(message="Logout successful")
+
+
+@auth_router.get("/sessions", status_code=status.HTTP_200_OK)
+async def get_sessions(token_data: dict = Depends(AcessTokenBearer())):
+    sessions = await session_store.list(token_data["user"]["uid"])
+
+    return response(
+        data=[
+            {
+                "session_id": session_id,
+                "current": session_id == token_data["session_id"],
+                **data,
+            }
+            for session_id, data in sessions.items()
+        ]
+    )
+
+
+@auth_router.post("/logout-all", status_code=status.HTTP_200_OK)
+async def logout_all(token_data: dict = Depends(AcessTokenBearer())):
+    # every token carrying one of the user's session ids stops working
+    await session_store.revoke_all(token_data["user"]["uid"])
+
+    return response(message="Logged out of all devices")
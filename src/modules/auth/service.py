@@ -1,5 +1,7 @@
+import uuid
 from datetime import datetime, timedelta
-from src.models import Token, User
+from src.models import Business, Token, User
+from .permissions import module_mask, permission_mask
 from .schemas import SocioUserCreateModel, UserCreateModel
 from .utils import generate_uuid
 
@@ -22,6 +24,23 @@ class AuthService:
         user = await session.exec(select(User).where(User.uid == uid))
         return user.first()
 
+    async def get_token_masks(self, user: User, session: AsyncSession) -> dict:
+        """Permission and module bitmasks for a new access token."""
+        modules = None
+
+        if user.business_id:
+            result = await session.exec(
+                select(Business.modules).where(
+                    Business.id == uuid.UUID(str(user.business_id))
+                )
+            )
+            modules = result.first()
+
+        return {
+            "permissions": permission_mask(user.role, user.permissions),
+            "modules": module_mask(modules),
+        }
+
     async def user_exists(self, email: str, session: AsyncSession) -> bool:
         user = await self.get_user_by_email(email, session)
         return bool(user)
@@ -0,0 +1,212 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List
+
+import orjson
+from fastapi import Request
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from src.common.responses import dumps
+from src.config.db import async_session
+from src.config.redis import get_async_store
+from src.models import AuthMetaData
+from .utils import REFRESH_TOKEN_EXPIRY
+
+logger = logging.getLogger(__name__)
+
+# "user_id:session_id" members waiting to be written to auth_meta_data
+DIRTY_KEY = "sessions:dirty"
+
+SESSION_TTL = timedelta(days=REFRESH_TOKEN_EXPIRY)
+
+# add the new session and drop the ones past expires_at. Each login pushes
+# the key's TTL out, so without pruning a user who logs in often would keep
+# every session they ever had
+CREATE_SESSION_SCRIPT = """
+local now = tonumber(ARGV[1])
+local sessions = redis.call('HGETALL', KEYS[1])
+for i = 1, #sessions, 2 do
+    local ok, data = pcall(cjson.decode, sessions[i + 1])
+    if not ok or tonumber(data['expires_at']) <= now then
+        redis.call('HDEL', KEYS[1], sessions[i])
+    end
+end
+redis.call('HSET', KEYS[1], ARGV[2], ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+"""
+
+# first match wins, so the more specific names come first
+OS_NAMES = [
+    ("Android", "Android"),
+    ("iPhone", "iOS"),
+    ("iPad", "iOS"),
+    ("Windows", "Windows"),
+    ("Mac OS X", "macOS"),
+    ("CrOS", "ChromeOS"),
+    ("Linux", "Linux"),
+]
+BROWSER_NAMES = [
+    ("Edg/", "Edge"),
+    ("OPR/", "Opera"),
+    ("Firefox/", "Firefox"),
+    ("Chrome/", "Chrome"),
+    ("Safari/", "Safari"),
+    ("okhttp", "Android app"),
+    ("Dart/", "Mobile app"),
+]
+
+
+@lru_cache(maxsize=None)
+def get_create_session_script():
+    return get_async_store().register_script(CREATE_SESSION_SCRIPT)
+
+
+def session_key(user_id: uuid.UUID | str) -> str:
+    return f"sessions:{user_id}"
+
+
+def _match(user_agent: str, names: list) -> str:
+    return next((name for token, name in names if token in user_agent), "unknown")
+
+
+def describe_device(request: Request) -> dict:
+    user_agent = request.headers.get("user-agent", "")
+
+    return {
+        "device_ip": request.client.host if request.client else "unknown",
+        "device_name": request.headers.get("x-device-name", "unknown"),
+        "device_os": _match(user_agent, OS_NAMES),
+        "device_browser": _match(user_agent, BROWSER_NAMES),
+        "timezone": request.headers.get("x-timezone", "unknown"),
+        "user_agent": user_agent[:512],
+    }
+
+
+class SessionStore:
+    """Per-device login sessions kept in one redis hash per user.
+
+    Each field is a session id holding the device's AuthMetaData fields, so
+    listing a user's devices is one HGETALL, logging a device out is one
+    HDEL and revoking every device is one UNLINK. Sessions reach
+    auth_meta_data through the periodic flusher, off the login path.
+    """
+
+    async def create(self, user_id: uuid.UUID | str, request: Request) -> str:
+        session_id = str(uuid.uuid4())
+        now = datetime.now()
+        data = {
+            **describe_device(request),
+            "login_time": now.isoformat(),
+            "expires_at": (now + SESSION_TTL).timestamp(),
+        }
+
+        # the hash lives as long as its newest session
+        await get_create_session_script()(
+            keys=[session_key(user_id)],
+            args=[
+                now.timestamp(),
+                session_id,
+                dumps(data),
+                int(SESSION_TTL.total_seconds()),
+            ],
+        )
+        await get_async_store().sadd(DIRTY_KEY, f"{user_id}:{session_id}")
+
+        return session_id
+
+    async def is_active(self, user_id: uuid.UUID | str, session_id: str) -> bool:
+        value = await get_async_store().hget(session_key(user_id), session_id)
+
+        if value is None:
+            return False
+
+        return orjson.loads(value)["expires_at"] > datetime.now().timestamp()
+
+    async def list(self, user_id: uuid.UUID | str) -> Dict[str, dict]:
+        sessions = await get_async_store().hgetall(session_key(user_id))
+        now = datetime.now().timestamp()
+
+        return {
+            session_id.decode(): data
+            for session_id, value in sessions.items()
+            if (data := orjson.loads(value))["expires_at"] > now
+        }
+
+    async def revoke(self, user_id: uuid.UUID | str, session_id: str):
+        await get_async_store().hdel(session_key(user_id), session_id)
+
+    async def revoke_all(self, user_id: uuid.UUID | str):
+        await get_async_store().unlink(session_key(user_id))
+
+    async def flush(self, batch_size: int) -> int:
+        """Write up to batch_size new sessions to auth_meta_data.
+
+        Returns how many queued sessions were taken, including revoked ones
+        that had nothing left to write, so callers can tell a full batch.
+        """
+        store = get_async_store()
+        members = await store.spop(DIRTY_KEY, batch_size)
+
+        if not members:
+            return 0
+
+        pairs = [member.decode().split(":", 1) for member in members]
+
+        pipe = store.pipeline(transaction=False)
+        for user_id, session_id in pairs:
+            pipe.hget(session_key(user_id), session_id)
+        values = await pipe.execute()
+
+        rows: List[dict] = []
+        for (user_id, session_id), value in zip(pairs, values):
+            # revoked before it was flushed, nothing left to record
+            if value is None:
+                continue
+
+            data = orjson.loads(value)
+            rows.append(
+                {
+                    "uid": uuid.UUID(session_id),
+                    "user_id": uuid.UUID(user_id),
+                    "device_ip": data["device_ip"],
+                    "device_name": data["device_name"],
+                    "device_os": data["device_os"],
+                    "device_browser": data["device_browser"],
+                    "timezone": data["timezone"],
+                    "user_agent": data["user_agent"],
+                    "login_time": datetime.fromisoformat(data["login_time"]),
+                }
+            )
+
+        if rows:
+            try:
+                async with async_session() as session:
+                    await session.execute(
+                        pg_insert(AuthMetaData)
+                        .values(rows)
+                        .on_conflict_do_nothing(index_elements=["uid"])
+                    )
+                    await session.commit()
+            except Exception:
+                # put them back so the next round retries
+                await store.sadd(DIRTY_KEY, *members)
+                raise
+
+        return len(members)
+
+    async def run_flusher(self, interval: float, batch_size: int):
+        while True:
+            await asyncio.sleep(interval)
+
+            try:
+                # drain the backlog in batches before sleeping again
+                while await self.flush(batch_size) == batch_size:
+                    pass
+            except Exception as e:
+                logger.exception(e)
+
+
+session_store = SessionStore()
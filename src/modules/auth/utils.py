@@ -1,12 +1,21 @@
+import asyncio
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 import jwt
 from src.config.settings import Config
+from src.common.metrics import BCRYPT_POOL_WAIT
 import uuid
 
 pwd_context = CryptContext(schemes=["bcrypt"])
 
+# bcrypt is deliberately slow, keep it off the event loop
+bcrypt_executor = ThreadPoolExecutor(
+    max_workers=Config.BCRYPT_POOL_SIZE, thread_name_prefix="bcrypt"
+)
+
 ACCESS_TOKEN_EXPIRY = 1
 REFRESH_TOKEN_EXPIRY = 2
 
@@ -19,7 +28,31 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
-def create_access_token(data: dict, refresh: bool = False, isTemp: bool = False) -> str:
+async def _run_in_bcrypt_pool(fn, *args):
+    submitted = time.perf_counter()
+
+    def run():
+        BCRYPT_POOL_WAIT.observe(time.perf_counter() - submitted)
+        return fn(*args)
+
+    return await asyncio.get_running_loop().run_in_executor(bcrypt_executor, run)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_bcrypt_pool(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_in_bcrypt_pool(get_password_hash, password)
+
+
+def create_access_token(
+    data: dict,
+    refresh: bool = False,
+    isTemp: bool = False,
+    permissions: int = 0,
+    modules: int = 0,
+) -> str:
     expiry = (
         datetime.now() + timedelta(minutes=10)
         if isTemp
@@ -34,6 +67,9 @@ def create_access_token(data: dict, refresh: bool = False, isTemp: bool = False)
             "session_id": data.get("session_id"),
             "refresh": refresh,
             "isTemp": isTemp,
+            # bitmasks from src.modules.auth.permissions
+            "perms": permissions,
+            "mods": modules,
         },
         key=Config.JWT_SECRET,
         algorithm=Config.JWT_ALGORITHM,
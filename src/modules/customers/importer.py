@@ -0,0 +1,48 @@
+import csv
+import itertools
+from typing import Dict, Iterator, List
+
+IMPORT_COLUMNS = [
+    "first_name",
+    "last_name",
+    "email",
+    "phone",
+    "address",
+    "payment_frequency",
+]
+
+
+def _normalize_header(header) -> List[str]:
+    return [str(column or "").strip().lower().replace(" ", "_") for column in header]
+
+
+def read_csv(path: str) -> Iterator[Dict]:
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        reader = csv.reader(file)
+        header = _normalize_header(next(reader, []))
+
+        for row in reader:
+            yield dict(zip(header, row))
+
+
+def read_xlsx(path: str) -> Iterator[Dict]:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = _normalize_header(next(rows, []))
+
+        for row in rows:
+            if any(value is not None for value in row):
+                yield dict(zip(header, row))
+    finally:
+        workbook.close()
+
+
+def next_chunk(rows: Iterator[Dict], size: int) -> List[Dict]:
+    return list(itertools.islice(rows, size))
+
+
+READERS = {"csv": read_csv, "xlsx": read_xlsx}
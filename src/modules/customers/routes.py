@@ -0,0 +1,105 @@
+import os
+import tempfile
+import uuid
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    File,
+    Query,
+    UploadFile,
+    status,
+)
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.common.errors import BusinessNotFound, ImportJobNotFound, InvalidImportFile
+from src.common.tracing import bind_context
+from src.common.utilities import response
+from src.config.settings import Config
+from src.models import User
+from src.modules.auth.dependencies import get_business_session, get_current_user
+from .importer import READERS
+from .service import CustomerService
+
+
+customer_router = APIRouter()
+customer_service = CustomerService()
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+@customer_router.post("/import", status_code=status.HTTP_202_ACCEPTED)
+async def import_customers(
+    bg_task: BackgroundTasks,
+    file: UploadFile = File(...),
+    user: User = Depends(get_current_user),
+):
+    if not user.business_id:
+        raise BusinessNotFound()
+
+    extension = os.path.splitext(file.filename or "")[1].lstrip(".").lower()
+
+    if extension not in READERS:
+        raise InvalidImportFile()
+
+    business_id = uuid.UUID(str(user.business_id))
+
+    # the upload is closed once the response is sent, so the job reads a copy
+    fd, path = tempfile.mkstemp(suffix=f".{extension}")
+
+    with os.fdopen(fd, "wb") as destination:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            destination.write(chunk)
+
+    job_id = customer_service.create_import_job(business_id)
+
+    bg_task.add_task(
+        bind_context(customer_service.import_customers),
+        job_id=job_id,
+        business_id=business_id,
+        path=path,
+        extension=extension,
+        chunk_size=Config.CUSTOMER_IMPORT_CHUNK_SIZE,
+    )
+
+    return response(
+        code=status.HTTP_202_ACCEPTED,
+        message="Customer import started",
+        data={"job_id": job_id},
+    )
+
+
+@customer_router.get("/import/{job_id}", status_code=status.HTTP_200_OK)
+async def get_customer_import(job_id: str, user: User = Depends(get_current_user)):
+    if not user.business_id:
+        raise BusinessNotFound()
+
+    job = customer_service.get_import_job(job_id, uuid.UUID(str(user.business_id)))
+
+    if job is None:
+        raise ImportJobNotFound()
+
+    return response(data=job)
+
+
+@customer_router.get("/search", status_code=status.HTTP_200_OK)
+async def search_customers(
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(default=10, ge=1, le=50),
+    cursor: str | None = None,
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_business_session),
+):
+    if not user.business_id:
+        raise BusinessNotFound()
+
+    customers, next_cursor = await customer_service.search_customers(
+        business_id=uuid.UUID(str(user.business_id)),
+        term=q,
+        limit=limit,
+        cursor=cursor,
+        session=session,
+    )
+
+    return response(data={"customers": customers, "next_cursor": next_cursor})
@@ -0,0 +1,50 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+from src.common.enums import PaymentFrequencyEnum
+from src.common.utilities import normalize_phone
+
+
+class CustomerImportRowModel(BaseModel):
+    first_name: str = Field(min_length=1, max_length=100)
+    last_name: Optional[str] = Field(default=None, max_length=100)
+    email: Optional[str] = Field(
+        default=None,
+        max_length=100,
+        pattern=r"^\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b$",
+    )
+    phone: Optional[str] = None
+    address: Optional[str] = Field(default=None, max_length=255)
+    payment_frequency: PaymentFrequencyEnum = PaymentFrequencyEnum.monthly
+
+    @field_validator("*", mode="before")
+    @classmethod
+    def blank_to_none(cls, value):
+        if value is None:
+            return None
+
+        value = str(value).strip()
+
+        return value or None
+
+    @field_validator("email")
+    @classmethod
+    def lower_email(cls, value: Optional[str]) -> Optional[str]:
+        return value.lower() if value else value
+
+    @field_validator("phone")
+    @classmethod
+    def valid_phone(cls, value: Optional[str]) -> Optional[str]:
+        phone = normalize_phone(value)
+
+        if phone is not None and not 7 <= len(phone) <= 15:
+            raise ValueError("phone must contain between 7 and 15 digits")
+
+        return phone
+
+    @field_validator("payment_frequency", mode="before")
+    @classmethod
+    def default_frequency(cls, value):
+        return PaymentFrequencyEnum.monthly if value is None else str(value).lower()
+
@@ -0,0 +1,349 @@
+import asyncio
+import base64
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import and_, case, func, literal_column, or_
+from sqlalchemy import select as sa_select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.common.errors import InvalidCursor
+from src.common.utilities import normalize_phone
+from src.config import RedisService
+from src.config.redis import get_async_store
+from src.config.shards import shard_router
+from src.models import Customer, customer_email_lower, customer_phone_digits
+from .importer import READERS, next_chunk
+from .schemas import CustomerImportRowModel
+
+logger = logging.getLogger(__name__)
+
+redis_service = RedisService()
+
+IMPORT_JOB_TTL = 86400
+MAX_REPORTED_ERRORS = 100
+
+COPY_COLUMNS = [
+    "id",
+    "business_id",
+    "first_name",
+    "last_name",
+    "email",
+    "phone",
+    "address",
+    "payment_frequency",
+    "next_payment_date",
+    "created_at",
+    "update_at",
+]
+
+
+def import_job_key(job_id: str) -> str:
+    return f"customer_import:{job_id}"
+
+
+def encode_cursor(score: float, id: uuid.UUID) -> str:
+    return base64.urlsafe_b64encode(json.dumps([score, str(id)]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[float, uuid.UUID]:
+    try:
+        score, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(score), uuid.UUID(id)
+    except Exception:
+        raise InvalidCursor()
+
+
+def escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class CustomerService:
+
+    def create_import_job(self, business_id: uuid.UUID) -> str:
+        job_id = str(uuid.uuid4())
+
+        redis_service.save_hash(
+            import_job_key(job_id),
+            {
+                "business_id": str(business_id),
+                "status": "queued",
+                "processed": 0,
+                "inserted": 0,
+                "duplicates": 0,
+                "invalid": 0,
+                "errors": "[]",
+            },
+            ttl=IMPORT_JOB_TTL,
+        )
+
+        return job_id
+
+    def get_import_job(self, job_id: str, business_id: uuid.UUID) -> dict | None:
+        job = redis_service.get_hash(import_job_key(job_id))
+
+        if not job or job.get("business_id") != str(business_id):
+            return None
+
+        return {
+            "job_id": job_id,
+            "status": job["status"],
+            "processed": int(job["processed"]),
+            "inserted": int(job["inserted"]),
+            "duplicates": int(job["duplicates"]),
+            "invalid": int(job["invalid"]),
+            "errors": json.loads(job["errors"]),
+        }
+
+    async def search_customers(
+        self,
+        business_id: uuid.UUID,
+        term: str,
+        limit: int,
+        cursor: str | None,
+        session: AsyncSession,
+    ) -> Tuple[List[dict], str | None]:
+        term = term.strip()
+        prefix = f"{escape_like(term)}%"
+        digits = normalize_phone(term)
+
+        prefix_matches = [
+            Customer.first_name.ilike(prefix, escape="\\"),
+            Customer.last_name.ilike(prefix, escape="\\"),
+            Customer.email.ilike(prefix, escape="\\"),
+        ]
+        similarities = [
+            func.similarity(Customer.first_name, term),
+            func.similarity(Customer.last_name, term),
+            func.similarity(Customer.email, term),
+        ]
+        matches = prefix_matches + [
+            Customer.first_name.op("%")(term),
+            Customer.last_name.op("%")(term),
+            Customer.email.op("%")(term),
+        ]
+
+        if digits and len(digits) >= 3:
+            similarities.append(func.similarity(customer_phone_digits, digits))
+            matches.append(customer_phone_digits.like(f"%{digits}%"))
+
+        # prefix hits outrank fuzzy ones so autocomplete behaves as typed
+        score = func.greatest(
+            case(
+                (or_(*prefix_matches), literal_column("1::real")),
+                else_=literal_column("0::real"),
+            ),
+            *similarities,
+        ).label("score")
+
+        ranked = (
+            sa_select(
+                Customer.id,
+                Customer.first_name,
+                Customer.last_name,
+                Customer.email,
+                Customer.phone,
+                score,
+            )
+            .where(Customer.business_id == business_id, or_(*matches))
+            .subquery()
+        )
+
+        statement = sa_select(ranked).order_by(ranked.c.score.desc(), ranked.c.id)
+
+        if cursor:
+            last_score, last_id = decode_cursor(cursor)
+            statement = statement.where(
+                or_(
+                    ranked.c.score < last_score,
+                    and_(ranked.c.score == last_score, ranked.c.id > last_id),
+                )
+            )
+
+        rows = (await session.execute(statement.limit(limit + 1))).mappings().all()
+
+        next_cursor = None
+
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["score"], rows[-1]["id"])
+
+        return [dict(row) for row in rows], next_cursor
+
+    async def existing_contacts(
+        self,
+        business_id: uuid.UUID,
+        emails: List[str],
+        phones: List[str],
+        session: AsyncSession,
+    ) -> Tuple[Set[str], Set[str]]:
+        if not emails and not phones:
+            return set(), set()
+
+        # compare in the same normalised form the import rows are in, so a
+        # stored "+234 801..." or "Ada@Example.com" still counts as a duplicate
+        result = await session.exec(
+            select(customer_email_lower, customer_phone_digits).where(
+                Customer.business_id == business_id,
+                or_(
+                    customer_email_lower.in_(emails),
+                    customer_phone_digits.in_(phones),
+                ),
+            )
+        )
+        rows = result.all()
+
+        return {row[0] for row in rows if row[0]}, {row[1] for row in rows if row[1]}
+
+    async def copy_customers(self, records: List[tuple], session: AsyncSession):
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+
+        await raw_connection.driver_connection.copy_records_to_table(
+            Customer.__tablename__, records=records, columns=COPY_COLUMNS
+        )
+
+    def validate_chunk(
+        self, rows: List[Dict], first_row_number: int
+    ) -> Tuple[List[CustomerImportRowModel], List[dict]]:
+        valid, errors = [], []
+
+        for row_number, row in enumerate(rows, start=first_row_number):
+            try:
+                valid.append(CustomerImportRowModel.model_validate(row))
+            except ValidationError as e:
+                error = e.errors()[0]
+                errors.append(
+                    {
+                        "row": row_number,
+                        "field": ".".join(str(loc) for loc in error["loc"]),
+                        "message": error["msg"],
+                    }
+                )
+
+        return valid, errors
+
+    async def update_import_job(self, key: str, mapping: dict):
+        # the job runs on the event loop, so progress goes through the async client
+        await get_async_store().hset(key, mapping=mapping)
+
+    async def import_customers(
+        self, job_id: str, business_id: uuid.UUID, path: str, extension: str, chunk_size: int
+    ):
+        key = import_job_key(job_id)
+        started = time.perf_counter()
+        progress = {"processed": 0, "inserted": 0, "duplicates": 0, "invalid": 0}
+        errors: List[dict] = []
+        seen_emails: Set[str] = set()
+        seen_phones: Set[str] = set()
+
+        rows = READERS[extension](path)
+
+        try:
+            await self.update_import_job(key, {"status": "running"})
+
+            async with shard_router.session(business_id) as session:
+                while True:
+                    chunk = await asyncio.to_thread(next_chunk, rows, chunk_size)
+
+                    if not chunk:
+                        break
+
+                    if progress["processed"] == 0 and "first_name" not in chunk[0]:
+                        raise ValueError("file has no first_name column")
+
+                    # header is row 1, so data starts on row 2
+                    valid, chunk_errors = await asyncio.to_thread(
+                        self.validate_chunk, chunk, progress["processed"] + 2
+                    )
+
+                    existing_emails, existing_phones = await self.existing_contacts(
+                        business_id,
+                        [c.email for c in valid if c.email],
+                        [c.phone for c in valid if c.phone],
+                        session,
+                    )
+
+                    now = datetime.now()
+                    records = []
+
+                    for customer in valid:
+                        if (
+                            customer.email
+                            and (
+                                customer.email in existing_emails
+                                or customer.email in seen_emails
+                            )
+                        ) or (
+                            customer.phone
+                            and (
+                                customer.phone in existing_phones
+                                or customer.phone in seen_phones
+                            )
+                        ):
+                            progress["duplicates"] += 1
+                            continue
+
+                        if customer.email:
+                            seen_emails.add(customer.email)
+                        if customer.phone:
+                            seen_phones.add(customer.phone)
+
+                        records.append(
+                            (
+                                uuid.uuid4(),
+                                business_id,
+                                customer.first_name,
+                                customer.last_name,
+                                customer.email,
+                                customer.phone,
+                                customer.address,
+                                customer.payment_frequency.value,
+                                now,
+                                now,
+                                now,
+                            )
+                        )
+
+                    if records:
+                        await self.copy_customers(records, session)
+                        await session.commit()
+
+                    progress["processed"] += len(chunk)
+                    progress["inserted"] += len(records)
+                    progress["invalid"] += len(chunk_errors)
+                    errors.extend(chunk_errors[: MAX_REPORTED_ERRORS - len(errors)])
+
+                    await self.update_import_job(
+                        key, {**progress, "errors": json.dumps(errors)}
+                    )
+
+            await self.update_import_job(key, {"status": "completed"})
+        except Exception as e:
+            logger.exception(e)
+            await self.update_import_job(
+                key,
+                {
+                    "status": "failed",
+                    "errors": json.dumps(errors + [{"row": None, "message": str(e)}]),
+                },
+            )
+        finally:
+            rows.close()
+            os.remove(path)
+
+            logger.info(
+                "customer import job=%s business=%s processed=%d inserted=%d elapsed=%.3fs",
+                job_id,
+                business_id,
+                progress["processed"],
+                progress["inserted"],
+                time.perf_counter() - started,
+            )
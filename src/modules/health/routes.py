@@ -0,0 +1,31 @@
+from fastapi import APIRouter, status
+
+from src.common.responses import FastJSONResponse
+from src.common.utilities import response
+from .service import health_service
+
+
+health_router = APIRouter()
+
+
+@health_router.get("/live", status_code=status.HTTP_200_OK)
+async def liveness():
+    return response(message="alive")
+
+
+@health_router.get("/ready", status_code=status.HTTP_200_OK)
+async def readiness():
+    result = await health_service.readiness()
+
+    if not result["ready"]:
+        return FastJSONResponse(
+            content=response(
+                status=False,
+                code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                message="not ready",
+                data=result,
+            ),
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+    return FastJSONResponse(content=response(message="ready", data=result))
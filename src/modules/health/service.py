@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import time
+from functools import partial
+from typing import Awaitable, Callable, Dict
+
+from sqlalchemy import text
+
+from src.config.redis import get_async_store
+from src.config.settings import Config
+from src.config.shards import DEFAULT_SHARD, shard_router
+
+logger = logging.getLogger(__name__)
+
+
+async def check_postgres(shard: str = DEFAULT_SHARD):
+    async with shard_router.get_engine(shard).connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def check_redis():
+    await get_async_store().ping()
+
+
+async def check_mail():
+    _, writer = await asyncio.open_connection(Config.MAIL_HEALTH_HOST, 443, ssl=True)
+    writer.close()
+    await writer.wait_closed()
+
+
+class HealthService:
+    """Readiness probes with a short-lived shared result.
+
+    Checks run in parallel, each with its own timeout. Concurrent callers
+    wait on one probe round instead of starting their own, so frequent load
+    balancer probes never multiply load on the dependencies.
+
+    Only ``checks`` gate readiness. ``optional_checks`` cover external
+    services the app degrades without, so they are reported but an outage
+    there does not pull every worker out of the load balancer.
+    """
+
+    def __init__(
+        self,
+        checks: Dict[str, Callable[[], Awaitable[None]]],
+        optional_checks: Dict[str, Callable[[], Awaitable[None]]] | None = None,
+    ):
+        self.checks = checks
+        self.optional_checks = optional_checks or {}
+        self._result: dict | None = None
+        self._expires = 0.0
+        self._lock = asyncio.Lock()
+
+    async def probe(self, name: str, check: Callable[[], Awaitable[None]]) -> dict:
+        started = time.perf_counter()
+
+        try:
+            await asyncio.wait_for(check(), timeout=Config.HEALTH_CHECK_TIMEOUT)
+            result = {"healthy": True, "error": None}
+        except asyncio.TimeoutError:
+            result = {"healthy": False, "error": "timed out"}
+        except Exception as e:
+            # the endpoint is unauthenticated, details only go to the log
+            logger.warning("health check %s failed: %r", name, e)
+            result = {"healthy": False, "error": "unavailable"}
+
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+        return result
+
+    async def readiness(self) -> dict:
+        if self._result is not None and time.monotonic() < self._expires:
+            return self._result
+
+        async with self._lock:
+            if self._result is not None and time.monotonic() < self._expires:
+                return self._result
+
+            all_checks = {**self.checks, **self.optional_checks}
+            results = await asyncio.gather(
+                *(self.probe(name, check) for name, check in all_checks.items())
+            )
+            checks = dict(zip(all_checks, results))
+
+            for name, check in checks.items():
+                check["required"] = name in self.checks
+
+            self._result = {
+                "ready": all(checks[name]["healthy"] for name in self.checks),
+                "checks": checks,
+            }
+            self._expires = time.monotonic() + Config.HEALTH_CACHE_TTL
+
+            return self._result
+
+
+# every shard gates readiness, as any business may be routed to any of them
+postgres_checks = {
+    "postgres" if shard == DEFAULT_SHARD else f"postgres:{shard}": partial(
+        check_postgres, shard
+    )
+    for shard in shard_router.shards
+}
+
+health_service = HealthService(
+    {**postgres_checks, "redis": check_redis},
+    optional_checks={"mail": check_mail},
+)
@@ -0,0 +1,34 @@
+import uuid
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.common.errors import BusinessNotFound
+from src.common.utilities import response
+from src.models import User
+from src.modules.auth.dependencies import get_business_session, get_current_user
+from .service import ledger_service
+
+
+ledger_router = APIRouter()
+
+
+@ledger_router.get("/balances", status_code=status.HTTP_200_OK)
+async def get_balances(
+    at: datetime | None = None,
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_business_session),
+):
+    if not user.business_id:
+        raise BusinessNotFound()
+
+    balances = await ledger_service.get_balances(
+        business_id=uuid.UUID(str(user.business_id)),
+        at=at,
+        session=session,
+    )
+
+    return response(
+        data={code: str(balance) for code, balance in balances.items()}
+    )
@@ -0,0 +1,13 @@
+import uuid
+from decimal import Decimal
+from typing import List, Optional, Tuple
+
+from pydantic import BaseModel
+
+
+class JournalEntryCreateModel(BaseModel):
+    business_id: uuid.UUID
+    transaction_id: Optional[uuid.UUID] = None
+    description: Optional[str] = None
+    # (account code, amount) with debits positive and credits negative
+    postings: List[Tuple[str, Decimal]]
@@ -0,0 +1,285 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import event, func, insert, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.common.enums import TransactionTypeEnum
+from src.common.errors import UnbalancedJournalEntry
+from src.config.redis import get_async_store
+from src.config.shards import shard_router
+from src.models import (
+    BalanceSnapshot,
+    JournalEntry,
+    LedgerAccount,
+    Posting,
+    Transaction,
+)
+from .schemas import JournalEntryCreateModel
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_LOCK_KEY = "ledger:snapshot:lock"
+# session.info key for account ids this transaction may have created
+PENDING_ACCOUNTS = "ledger_pending_accounts"
+
+CENT = Decimal("0.0001")
+
+# account debited and account credited for each transaction type
+TRANSACTION_ACCOUNTS: Dict[TransactionTypeEnum, Tuple[str, str]] = {
+    TransactionTypeEnum.customer_deposit: ("cash", "customer_deposits"),
+    TransactionTypeEnum.user_contribution: ("cash", "contributions"),
+    TransactionTypeEnum.payout: ("customer_deposits", "cash"),
+    TransactionTypeEnum.loan_out: ("loans_receivable", "cash"),
+    TransactionTypeEnum.loan_repayment: ("cash", "loans_receivable"),
+    TransactionTypeEnum.expense: ("expenses", "cash"),
+    TransactionTypeEnum.income: ("cash", "income"),
+}
+
+# Postings are cut by transaction id rather than time. Every transaction
+# below the current snapshot's xmin has finished, so the postings under that
+# horizon are final; later ones, including slow commits, stay in the tail and
+# are picked up by the next snapshot instead of being skipped.
+SNAPSHOT_SQL = text(
+    """
+    WITH horizon AS (SELECT pg_snapshot_xmin(pg_current_snapshot()) AS xmin)
+    INSERT INTO ledger_balance_snapshots
+        (account_id, balance, as_of, xact_horizon, created_at)
+    SELECT a.id, COALESCE(s.balance, 0) + t.total, LOCALTIMESTAMP, h.xmin,
+           LOCALTIMESTAMP
+    FROM ledger_accounts a
+    CROSS JOIN horizon h
+    LEFT JOIN LATERAL (
+        SELECT balance, xact_horizon FROM ledger_balance_snapshots
+        WHERE account_id = a.id ORDER BY xact_horizon DESC LIMIT 1
+    ) s ON true
+    CROSS JOIN LATERAL (
+        SELECT SUM(p.amount) AS total FROM ledger_postings p
+        WHERE p.account_id = a.id
+          AND (s.xact_horizon IS NULL OR p.xact_id >= s.xact_horizon)
+          AND p.xact_id < h.xmin
+    ) t
+    WHERE t.total IS NOT NULL
+    """
+)
+
+# a snapshot taken by :at only covers postings committed before it, whose
+# created_at (their transaction's start) is earlier still. A null :at reads
+# the current balance by the database clock
+BALANCES_SQL = text(
+    """
+    WITH bound AS (SELECT COALESCE(CAST(:at AS timestamp), LOCALTIMESTAMP) AS at)
+    SELECT a.code, COALESCE(s.balance, 0) + COALESCE(t.total, 0) AS balance
+    FROM ledger_accounts a
+    CROSS JOIN bound b
+    LEFT JOIN LATERAL (
+        SELECT balance, xact_horizon FROM ledger_balance_snapshots
+        WHERE account_id = a.id AND as_of <= b.at
+        ORDER BY as_of DESC LIMIT 1
+    ) s ON true
+    CROSS JOIN LATERAL (
+        SELECT SUM(p.amount) AS total FROM ledger_postings p
+        WHERE p.account_id = a.id
+          AND (s.xact_horizon IS NULL OR p.xact_id >= s.xact_horizon)
+          AND p.created_at <= b.at
+    ) t
+    WHERE a.business_id = :business_id
+    """
+)
+
+
+class LedgerService:
+
+    def __init__(self):
+        # account ids never change once committed, so they are safe to keep.
+        # Ids read inside an open transaction wait in session.info until it
+        # commits, as a rollback would leave them pointing at nothing
+        self._accounts: Dict[Tuple[uuid.UUID, str], uuid.UUID] = {}
+
+        event.listen(Session, "after_commit", self._promote_accounts)
+        event.listen(Session, "after_rollback", self._discard_accounts)
+
+    def _promote_accounts(self, session: Session):
+        self._accounts.update(session.info.pop(PENDING_ACCOUNTS, {}))
+
+    def _discard_accounts(self, session: Session):
+        session.info.pop(PENDING_ACCOUNTS, None)
+
+    async def get_account_ids(
+        self, business_id: uuid.UUID, codes: Iterable[str], session: AsyncSession
+    ) -> Dict[str, uuid.UUID]:
+        codes = set(codes)
+        pending = session.info.setdefault(PENDING_ACCOUNTS, {})
+        known = {**pending, **self._accounts}
+        missing = [c for c in codes if (business_id, c) not in known]
+
+        if missing:
+            await session.execute(
+                pg_insert(LedgerAccount)
+                .values(
+                    [
+                        {
+                            "id": uuid.uuid4(),
+                            "business_id": business_id,
+                            "code": code,
+                            "created_at": datetime.now(),
+                        }
+                        for code in missing
+                    ]
+                )
+                .on_conflict_do_nothing(index_elements=["business_id", "code"])
+            )
+            accounts = await session.exec(
+                select(LedgerAccount.code, LedgerAccount.id).where(
+                    LedgerAccount.business_id == business_id,
+                    LedgerAccount.code.in_(missing),
+                )
+            )
+            for code, id in accounts.all():
+                known[(business_id, code)] = pending[(business_id, code)] = id
+
+        return {code: known[(business_id, code)] for code in codes}
+
+    async def post_entries(
+        self, entries: List[JournalEntryCreateModel], session: AsyncSession
+    ) -> List[uuid.UUID]:
+        """Write a batch of journal entries with one insert per table.
+
+        The caller owns the commit so entries land atomically with the
+        business rows that produced them. Timestamps come from the database
+        clock, so created_at agrees with the snapshots' as_of whichever
+        worker wrote the entry.
+        """
+        entry_rows, posting_rows = [], []
+
+        for entry in entries:
+            postings = [
+                (code, Decimal(amount).quantize(CENT)) for code, amount in entry.postings
+            ]
+
+            if len(postings) < 2 or sum(amount for _, amount in postings) != 0:
+                raise UnbalancedJournalEntry()
+
+            account_ids = await self.get_account_ids(
+                entry.business_id, [code for code, _ in postings], session
+            )
+            entry_id = uuid.uuid4()
+
+            entry_rows.append(
+                {
+                    "id": entry_id,
+                    "business_id": entry.business_id,
+                    "transaction_id": entry.transaction_id,
+                    "description": entry.description,
+                }
+            )
+            posting_rows.extend(
+                {
+                    "entry_id": entry_id,
+                    "account_id": account_ids[code],
+                    "amount": amount,
+                }
+                for code, amount in postings
+            )
+
+        if entry_rows:
+            now = func.localtimestamp()
+            await session.execute(
+                insert(JournalEntry).values(created_at=now), entry_rows
+            )
+            await session.execute(insert(Posting).values(created_at=now), posting_rows)
+
+        return [row["id"] for row in entry_rows]
+
+    async def post_transactions(
+        self, transactions: List[Transaction], session: AsyncSession
+    ) -> List[uuid.UUID]:
+        entries = []
+
+        for transaction in transactions:
+            debit, credit = TRANSACTION_ACCOUNTS[
+                TransactionTypeEnum(transaction.transaction_type)
+            ]
+            amount = Decimal(str(transaction.amount))
+
+            entries.append(
+                JournalEntryCreateModel(
+                    business_id=transaction.business_id,
+                    transaction_id=transaction.id,
+                    description=transaction.description,
+                    postings=[(debit, amount), (credit, -amount)],
+                )
+            )
+
+        return await self.post_entries(entries, session)
+
+    async def get_balance(
+        self, account_id: uuid.UUID, at: datetime, session: AsyncSession
+    ) -> Decimal:
+        snapshot = (
+            await session.exec(
+                select(BalanceSnapshot)
+                .where(
+                    BalanceSnapshot.account_id == account_id,
+                    BalanceSnapshot.as_of <= at,
+                )
+                .order_by(BalanceSnapshot.as_of.desc())
+                .limit(1)
+            )
+        ).first()
+
+        tail = select(func.coalesce(func.sum(Posting.amount), 0)).where(
+            Posting.account_id == account_id, Posting.created_at <= at
+        )
+
+        if snapshot is not None:
+            tail = tail.where(Posting.xact_id >= snapshot.xact_horizon)
+
+        total = (await session.exec(tail)).one()
+
+        return (snapshot.balance if snapshot else Decimal(0)) + total
+
+    async def get_balances(
+        self, business_id: uuid.UUID, at: datetime | None, session: AsyncSession
+    ) -> Dict[str, Decimal]:
+        balances = await session.execute(
+            BALANCES_SQL, {"business_id": business_id, "at": at}
+        )
+
+        return {code: balance for code, balance in balances.all()}
+
+    async def take_snapshots(self) -> int:
+        count = 0
+
+        for shard in shard_router.shards:
+            async with shard_router.get_sessionmaker(shard)() as session:
+                result = await session.execute(SNAPSHOT_SQL)
+                await session.commit()
+
+            count += result.rowcount
+
+        return count
+
+    async def run_snapshots(self, interval: int):
+        while True:
+            await asyncio.sleep(interval)
+
+            try:
+                # one worker snapshots per interval, the lock expires on its own
+                if await get_async_store().set(
+                    SNAPSHOT_LOCK_KEY, "1", nx=True, ex=interval
+                ):
+                    count = await self.take_snapshots()
+                    logger.info("ledger snapshots written accounts=%d", count)
+            except Exception as e:
+                logger.exception(e)
+
+
+ledger_service = LedgerService()
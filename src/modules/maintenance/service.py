@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from sqlalchemy import text
+
+from src.common.metrics import SWEEPER_ROWS_DELETED, SWEEPER_RUN_DURATION
+from src.config.db import async_session
+from src.config.redis import extend_lock, get_async_store, release_lock
+from src.config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+# RUN_KEY lets one worker start a sweep per interval, LOCK_KEY is held by
+# the running sweep for as long as it keeps making progress
+RUN_KEY = "sweeper:last_run"
+LOCK_KEY = "sweeper:lock"
+
+
+class SweeperLockLost(Exception):
+    """The sweep stalled long enough for its lock to expire."""
+
+
+class RetentionPolicy:
+    """Rows of ``table`` matching ``condition`` are due for deletion.
+
+    ``condition`` is SQL over the table's columns with a ``:cutoff`` bind,
+    and ``cutoff`` returns its value at the start of each run. Rows are
+    walked in ``key`` order, which must be the primary key.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        table: str,
+        condition: str,
+        cutoff: Callable[[], datetime],
+        key: str = "id",
+    ):
+        self.name = name
+        self.cutoff = cutoff
+        self.statement = text(
+            f"""
+            WITH batch AS (
+                SELECT {key} FROM {table}
+                WHERE {key} > :after AND {condition}
+                ORDER BY {key}
+                LIMIT :batch_size
+            )
+            DELETE FROM {table} t USING batch
+            WHERE t.{key} = batch.{key}
+            RETURNING t.{key}
+            """
+        )
+
+
+RETENTION_POLICIES: List[RetentionPolicy] = [
+    RetentionPolicy(
+        "expired_tokens",
+        "tokens",
+        "expiry < :cutoff",
+        lambda: datetime.now() - timedelta(hours=Config.TOKEN_RETENTION_HOURS),
+    ),
+    RetentionPolicy(
+        "old_login_events",
+        "login_events",
+        "created_at < :cutoff",
+        lambda: datetime.now() - timedelta(days=Config.LOGIN_EVENT_RETENTION_DAYS),
+    ),
+]
+
+
+class SweeperService:
+    """Deletes rows that outlived their retention policy in small batches.
+
+    Each batch is its own short transaction that resumes after the last key
+    deleted, so locks are brief and scans never restart from the top. The
+    pause between batches caps the delete rate and gives autovacuum and
+    replicas room to keep up.
+    """
+
+    def __init__(
+        self,
+        policies: List[RetentionPolicy],
+        batch_size: int,
+        batch_sleep: float,
+        max_rows_per_second: int,
+    ):
+        self.policies = policies
+        self.batch_size = batch_size
+        self.batch_sleep = batch_sleep
+        self.max_rows_per_second = max_rows_per_second
+
+    async def sweep(
+        self, policy: RetentionPolicy, lock_token: str | None = None
+    ) -> int:
+        cutoff = policy.cutoff()
+        after = 0
+        deleted = 0
+        # the slowest a batch may go and still stay under the rate cap
+        min_batch_time = (
+            self.batch_size / self.max_rows_per_second
+            if self.max_rows_per_second > 0
+            else 0
+        )
+
+        with SWEEPER_RUN_DURATION.labels(policy.name).time():
+            while True:
+                started = time.perf_counter()
+
+                async with async_session() as session:
+                    result = await session.execute(
+                        policy.statement,
+                        {
+                            "after": after,
+                            "cutoff": cutoff,
+                            "batch_size": self.batch_size,
+                        },
+                    )
+                    keys = result.scalars().all()
+                    await session.commit()
+
+                if not keys:
+                    break
+
+                deleted += len(keys)
+                after = max(keys)
+                SWEEPER_ROWS_DELETED.labels(policy.name).inc(len(keys))
+
+                if len(keys) < self.batch_size:
+                    break
+
+                if lock_token and not await extend_lock(
+                    LOCK_KEY, lock_token, Config.SWEEP_LOCK_TTL
+                ):
+                    raise SweeperLockLost()
+
+                elapsed = time.perf_counter() - started
+                await asyncio.sleep(max(self.batch_sleep, min_batch_time - elapsed))
+
+        return deleted
+
+    async def run_once(self, lock_token: str | None = None) -> Dict[str, int]:
+        report = {}
+
+        for policy in self.policies:
+            try:
+                report[policy.name] = await self.sweep(policy, lock_token)
+            except SweeperLockLost:
+                logger.warning("sweeper lock expired during %s, stopping", policy.name)
+                break
+            except Exception as e:
+                logger.exception(e)
+
+        logger.info("sweeper removed %s", report)
+
+        return report
+
+    async def run(self, interval: int):
+        while True:
+            await asyncio.sleep(interval)
+
+            try:
+                store = get_async_store()
+
+                if not await store.set(RUN_KEY, "1", nx=True, ex=interval):
+                    continue
+
+                # a sweep from an earlier interval may still be going
+                token = uuid.uuid4().hex
+                if not await store.set(
+                    LOCK_KEY, token, nx=True, ex=Config.SWEEP_LOCK_TTL
+                ):
+                    continue
+
+                try:
+                    await self.run_once(token)
+                finally:
+                    await release_lock(LOCK_KEY, token)
+            except Exception as e:
+                logger.exception(e)
+
+
+sweeper_service = SweeperService(
+    RETENTION_POLICIES,
+    batch_size=Config.SWEEP_BATCH_SIZE,
+    batch_sleep=Config.SWEEP_BATCH_SLEEP,
+    max_rows_per_second=Config.SWEEP_MAX_ROWS_PER_SECOND,
+)
@@ -0,0 +1,249 @@
+import asyncio
+import logging
+import time
+import uuid
+from functools import lru_cache
+from typing import AsyncGenerator, Dict, Set, Tuple
+
+from src.common.responses import dumps
+from src.config.lifecycle import lifecycle
+from src.config.redis import get_async_store
+from src.config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+# the braces keep a business's stream and channel in one cluster slot
+STREAM_KEY = "approvals:{{{business_id}}}:stream"
+CHANNEL_KEY = "approvals:{{{business_id}}}:events"
+
+RETRY_MS = 3000
+
+# append to the bounded stream for resume, then fan out with the new id
+PUBLISH_SCRIPT = """
+local id = redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[1], '*',
+                      'event', ARGV[2], 'data', ARGV[3])
+redis.call('PUBLISH', KEYS[2], id .. '\\n' .. ARGV[2] .. '\\n' .. ARGV[3])
+return id
+"""
+
+
+@lru_cache(maxsize=None)
+def get_publish_script():
+    return get_async_store().register_script(PUBLISH_SCRIPT)
+
+
+def stream_id(value: str) -> Tuple[int, int]:
+    ms, _, seq = value.partition("-")
+    return int(ms), int(seq or 0)
+
+
+def format_event(id: str, event: str, data: str) -> str:
+    return f"id: {id}\nevent: {event}\ndata: {data}\n\n"
+
+
+async def publish_approval_event(
+    business_id: uuid.UUID, event: str, data: dict
+) -> str | None:
+    """Append and fan out one event, returning its id.
+
+    Called after the change is committed, so a redis failure is logged and
+    swallowed rather than failing a request whose work already happened.
+    Listeners that missed the event catch up on their next reload.
+    """
+    try:
+        event_id = await get_publish_script()(
+            keys=[
+                STREAM_KEY.format(business_id=business_id),
+                CHANNEL_KEY.format(business_id=business_id),
+            ],
+            args=[Config.APPROVAL_STREAM_MAXLEN, event, dumps(data)],
+        )
+    except Exception as e:
+        logger.error(
+            "failed to publish %s for business %s: %r", event, business_id, e
+        )
+        return None
+
+    return event_id.decode()
+
+
+class Connection:
+    __slots__ = ("queue", "lagged", "closed")
+
+    def __init__(self, size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=size)
+        self.lagged = False
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+        # wake the stream if it is waiting; a full queue is being read anyway
+        try:
+            self.queue.put_nowait(None)
+        except asyncio.QueueFull:
+            pass
+
+
+class ApprovalHub:
+    """Fans approval events out to this worker's SSE connections.
+
+    The worker holds one pub/sub connection and subscribes to a business's
+    channel while at least one of its clients is listening. Every client has
+    a bounded queue; one that falls behind is disconnected and resumes from
+    the redis stream with Last-Event-ID instead of growing memory.
+
+    Streams would otherwise keep the worker's connections open through a
+    graceful shutdown, so every connection is closed as soon as the worker
+    stops accepting requests.
+    """
+
+    def __init__(self):
+        self._connections: Dict[str, Set[Connection]] = {}
+        self._pubsub = None
+        self._reader: asyncio.Task | None = None
+        lifecycle.on_stop(self.close_all)
+
+    def close_all(self):
+        for connections in self._connections.values():
+            for connection in connections:
+                connection.close()
+
+    async def subscribe(self, business_id: uuid.UUID) -> Connection:
+        channel = CHANNEL_KEY.format(business_id=business_id)
+        connection = Connection(Config.APPROVAL_QUEUE_SIZE)
+
+        if self._pubsub is None:
+            self._pubsub = get_async_store().pubsub()
+
+        if channel not in self._connections:
+            self._connections[channel] = set()
+            await self._pubsub.subscribe(channel)
+
+        self._connections[channel].add(connection)
+
+        if not lifecycle.accepting:
+            connection.close()
+
+        if self._reader is None or self._reader.done():
+            self._reader = lifecycle.start_task(self._read())
+
+        return connection
+
+    async def unsubscribe(self, business_id: uuid.UUID, connection: Connection):
+        channel = CHANNEL_KEY.format(business_id=business_id)
+        connections = self._connections.get(channel)
+
+        if connections is None:
+            return
+
+        connections.discard(connection)
+
+        if not connections:
+            del self._connections[channel]
+            await self._pubsub.unsubscribe(channel)
+
+    def _dispatch(self, channel: str, payload: bytes):
+        id, event, data = payload.decode().split("\n", 2)
+
+        for connection in self._connections.get(channel, ()):
+            if connection.lagged:
+                continue
+
+            try:
+                connection.queue.put_nowait((id, event, data))
+            except asyncio.QueueFull:
+                connection.lagged = True
+
+    async def _read(self):
+        while True:
+            try:
+                if not self._pubsub.subscribed:
+                    await asyncio.sleep(0.1)
+                    continue
+
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+
+                if message is not None:
+                    self._dispatch(message["channel"].decode(), message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(e)
+                await asyncio.sleep(1)
+
+
+approval_hub = ApprovalHub()
+
+
+async def replay(
+    business_id: uuid.UUID, last_event_id: str
+) -> AsyncGenerator[Tuple[str, str, str], None]:
+    """(id, event, data) after ``last_event_id`` that are still in the stream."""
+    key = STREAM_KEY.format(business_id=business_id)
+    store = get_async_store()
+
+    oldest = await store.xrange(key, count=1)
+
+    # older events were trimmed, the client has to reload pending items
+    if oldest and stream_id(oldest[0][0].decode()) > stream_id(last_event_id):
+        yield last_event_id, "reset", "{}"
+
+    entries = await store.xrange(
+        key, min=f"({last_event_id}", count=Config.APPROVAL_STREAM_MAXLEN
+    )
+
+    for id, fields in entries:
+        yield id.decode(), fields[b"event"].decode(), fields[b"data"].decode()
+
+
+async def approval_events(
+    business_id: uuid.UUID, last_event_id: str | None
+) -> AsyncGenerator[str, None]:
+    connection = await approval_hub.subscribe(business_id)
+    heartbeat = Config.APPROVAL_HEARTBEAT_INTERVAL
+    last_sent = time.monotonic()
+    last_id = (0, 0)
+
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+
+        # subscribed first, so nothing published during the replay is lost;
+        # anything seen in both is skipped by id below
+        if last_event_id:
+            try:
+                last_id = stream_id(last_event_id)
+            except ValueError:
+                last_event_id = None
+
+        if last_event_id:
+            async for id, event, data in replay(business_id, last_event_id):
+                last_id = max(last_id, stream_id(id))
+                yield format_event(id, event, data)
+
+        while not connection.closed and not connection.lagged:
+            timeout = max(0.0, heartbeat - (time.monotonic() - last_sent))
+
+            try:
+                item = await asyncio.wait_for(connection.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                last_sent = time.monotonic()
+                yield ": ping\n\n"
+                continue
+
+            # closed by the hub because the worker is shutting down
+            if item is None:
+                break
+
+            id, event, data = item
+
+            if stream_id(id) <= last_id:
+                continue
+
+            last_id = stream_id(id)
+            last_sent = time.monotonic()
+            yield format_event(id, event, data)
+    finally:
+        await approval_hub.unsubscribe(business_id, connection)
@@ -0,0 +1,136 @@
+import csv
+import io
+from typing import Any, List, Sequence
+
+EXPORT_COLUMNS = [
+    "id",
+    "business_id",
+    "amount",
+    "transaction_type",
+    "status",
+    "description",
+    "requires_approval",
+    "number_of_required_approval",
+    "created_at",
+    "updated_at",
+]
+
+
+def _text(value: Any) -> Any:
+    if value is None:
+        return None
+    return getattr(value, "value", value) if not isinstance(value, str) else value
+
+
+class CSVEncoder:
+    media_type = "text/csv"
+    extension = "csv"
+
+    def __init__(self):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self._writer.writerow(EXPORT_COLUMNS)
+
+    def _drain(self) -> bytes:
+        data = self._buffer.getvalue().encode()
+        self._buffer.seek(0)
+        self._buffer.truncate(0)
+        return data
+
+    def header(self) -> bytes:
+        return self._drain()
+
+    def encode(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        self._writer.writerows(
+            [
+                [
+                    value.isoformat() if hasattr(value, "isoformat") else _text(value)
+                    for value in row
+                ]
+                for row in rows
+            ]
+        )
+        return self._drain()
+
+    def close(self) -> bytes:
+        return b""
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only sink that hands back what was written since the last drain.
+
+    Parquet footers record absolute offsets, so ``tell`` has to keep counting
+    even though the written bytes are released after every row group.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ParquetEncoder:
+    media_type = "application/vnd.apache.parquet"
+    extension = "parquet"
+
+    def __init__(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._schema = pa.schema(
+            [
+                ("id", pa.string()),
+                ("business_id", pa.string()),
+                ("amount", pa.float64()),
+                ("transaction_type", pa.string()),
+                ("status", pa.string()),
+                ("description", pa.string()),
+                ("requires_approval", pa.bool_()),
+                ("number_of_required_approval", pa.int32()),
+                ("created_at", pa.timestamp("us")),
+                ("updated_at", pa.timestamp("us")),
+            ]
+        )
+        self._sink = _ChunkSink()
+        self._writer = pq.ParquetWriter(
+            pa.PythonFile(self._sink, mode="w"), self._schema, compression="snappy"
+        )
+
+    def header(self) -> bytes:
+        return self._sink.drain()
+
+    def encode(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        columns = list(zip(*rows))
+        arrays = []
+        for field, values in zip(self._schema, columns):
+            if self._pa.types.is_string(field.type):
+                values = [None if v is None else str(_text(v)) for v in values]
+            arrays.append(self._pa.array(values, type=field.type))
+
+        self._writer.write_table(
+            self._pa.Table.from_arrays(arrays, schema=self._schema)
+        )
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+ENCODERS = {"csv": CSVEncoder, "parquet": ParquetEncoder}
@@ -0,0 +1,122 @@
+import uuid
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.common.enums import ExportFormatEnum
+from src.common.errors import BusinessNotFound
+from src.common.idempotency import IdempotentRoute
+from src.common.utilities import response
+from src.config.settings import Config
+from src.models import User
+from src.modules.auth.dependencies import (
+    PermissionChecker,
+    get_business_session,
+    get_current_user,
+)
+from .events import approval_events
+from .export import ENCODERS
+from .schemas import TransactionCreateModel
+from .service import TransactionService
+
+
+transaction_router = APIRouter(route_class=IdempotentRoute)
+transaction_service = TransactionService()
+
+
+@transaction_router.post("", status_code=status.HTTP_201_CREATED)
+async def create_transaction(
+    transaction_data: TransactionCreateModel,
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_business_session),
+):
+    if not user.business_id:
+        raise BusinessNotFound()
+
+    new_transaction = await transaction_service.create_transaction(
+        business_id=uuid.UUID(str(user.business_id)),
+        transaction_data=transaction_data,
+        session=session,
+    )
+
+    return response(
+        code=status.HTTP_201_CREATED,
+        message="Transaction created successfully",
+        data=new_transaction,
+    )
+
+
+@transaction_router.get("/export", status_code=status.HTTP_200_OK)
+async def export_transactions(
+    start_date: datetime,
+    end_date: datetime,
+    format: ExportFormatEnum = Query(default=ExportFormatEnum.csv),
+    user: User = Depends(get_current_user),
+):
+    if not user.business_id:
+        raise BusinessNotFound()
+
+    business_id = uuid.UUID(str(user.business_id))
+    encoder = ENCODERS[format.value]
+
+    filename = f"transactions_{start_date:%Y%m%d}_{end_date:%Y%m%d}.{encoder.extension}"
+
+    return StreamingResponse(
+        transaction_service.export_transactions(
+            business_id=business_id,
+            start_date=start_date,
+            end_date=end_date,
+            format=format.value,
+            chunk_size=Config.EXPORT_CHUNK_SIZE,
+        ),
+        media_type=encoder.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@transaction_router.get(
+    "/approvals/stream",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(PermissionChecker("transactions:approve"))],
+)
+async def stream_approvals(request: Request, user: User = Depends(get_current_user)):
+    if not user.business_id:
+        raise BusinessNotFound()
+
+    return StreamingResponse(
+        approval_events(
+            business_id=uuid.UUID(str(user.business_id)),
+            last_event_id=request.headers.get("last-event-id"),
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@transaction_router.post(
+    "/{transaction_id}/approve",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(PermissionChecker("transactions:approve"))],
+)
+async def approve_transaction(
+    transaction_id: uuid.UUID,
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_business_session),
+):
+    if not user.business_id:
+        raise BusinessNotFound()
+
+    transaction = await transaction_service.approve_transaction(
+        business_id=uuid.UUID(str(user.business_id)),
+        transaction_id=transaction_id,
+        user_id=user.uid,
+        session=session,
+    )
+
+    return response(
+        code=status.HTTP_200_OK,
+        message="Transaction approved successfully",
+        data=transaction,
+    )
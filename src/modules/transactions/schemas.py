@@ -0,0 +1,14 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from src.common.enums import TransactionTypeEnum
+
+
+class TransactionCreateModel(BaseModel):
+    amount: float = Field(gt=0, examples=[5000.0])
+    transaction_type: TransactionTypeEnum = Field(
+        examples=[TransactionTypeEnum.customer_deposit]
+    )
+    description: Optional[str] = Field(default=None, max_length=255)
+    meta_data: Optional[dict] = None
@@ -0,0 +1,226 @@
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import AsyncGenerator
+
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.common.cache import cached
+from src.common.enums import TransactionStatusEnum
+from src.common.errors import (
+    TransactionAlreadyApproved,
+    TransactionNotFound,
+    TransactionNotPending,
+)
+from src.config.shards import shard_router
+from src.models import Transaction, TransactionApproval, TransactionTypeSetting
+from src.modules.ledger.service import ledger_service
+from .events import publish_approval_event
+from .export import ENCODERS, EXPORT_COLUMNS
+from .schemas import TransactionCreateModel
+
+logger = logging.getLogger(__name__)
+
+
+class TransactionService:
+
+    # read on every transaction create and rarely changed
+    @cached(
+        ttl=300,
+        key="{business_id}:{transaction_type}",
+        session_factory=lambda business_id, **_: shard_router.session(business_id),
+    )
+    async def get_type_setting(
+        self, business_id: uuid.UUID, transaction_type: str, session: AsyncSession
+    ) -> TransactionTypeSetting | None:
+        setting = await session.exec(
+            select(TransactionTypeSetting).where(
+                TransactionTypeSetting.business_id == business_id,
+                TransactionTypeSetting.type == transaction_type,
+            )
+        )
+        return setting.first()
+
+    async def create_transaction(
+        self,
+        business_id: uuid.UUID,
+        transaction_data: TransactionCreateModel,
+        session: AsyncSession,
+    ) -> Transaction:
+        transaction_type = transaction_data.transaction_type.value
+
+        setting = await self.get_type_setting(business_id, transaction_type, session)
+
+        requires_approval = bool(setting and setting.requires_approval)
+
+        new_transaction = Transaction(
+            business_id=business_id,
+            amount=transaction_data.amount,
+            transaction_type=transaction_type,
+            description=transaction_data.description,
+            meta_data=transaction_data.meta_data,
+            requires_approval=requires_approval,
+            number_of_required_approval=(
+                setting.number_of_required_approval if requires_approval else 0
+            ),
+            status=(
+                TransactionStatusEnum.pending.value
+                if requires_approval
+                else TransactionStatusEnum.completed.value
+            ),
+        )
+
+        session.add(new_transaction)
+
+        if new_transaction.status == TransactionStatusEnum.completed.value:
+            await session.flush()
+            await ledger_service.post_transactions([new_transaction], session)
+
+        await session.commit()
+
+        if requires_approval:
+            await publish_approval_event(
+                business_id,
+                "approval_requested",
+                approval_event_data(new_transaction, approvals=0),
+            )
+
+        return new_transaction
+
+    async def approve_transaction(
+        self,
+        business_id: uuid.UUID,
+        transaction_id: uuid.UUID,
+        user_id: uuid.UUID,
+        session: AsyncSession,
+    ) -> Transaction:
+        # the row lock serialises approvers, so only one of them can be the
+        # sign-off that completes the transaction and posts it to the ledger
+        transaction = (
+            await session.exec(
+                select(Transaction)
+                .where(
+                    Transaction.id == transaction_id,
+                    Transaction.business_id == business_id,
+                )
+                .with_for_update()
+            )
+        ).first()
+
+        if transaction is None:
+            raise TransactionNotFound()
+
+        if transaction.status != TransactionStatusEnum.pending.value:
+            raise TransactionNotPending()
+
+        already_approved = (
+            await session.exec(
+                select(TransactionApproval.id).where(
+                    TransactionApproval.transaction_id == transaction_id,
+                    TransactionApproval.user_id == user_id,
+                )
+            )
+        ).first()
+
+        if already_approved is not None:
+            raise TransactionAlreadyApproved()
+
+        session.add(TransactionApproval(transaction_id=transaction_id, user_id=user_id))
+        await session.flush()
+
+        approvals = (
+            await session.exec(
+                select(func.count()).where(
+                    TransactionApproval.transaction_id == transaction_id
+                )
+            )
+        ).one()
+
+        completed = approvals >= transaction.number_of_required_approval
+
+        if completed:
+            transaction.status = TransactionStatusEnum.completed.value
+            session.add(transaction)
+            await ledger_service.post_transactions([transaction], session)
+
+        await session.commit()
+
+        data = approval_event_data(transaction, approvals)
+        await publish_approval_event(business_id, "approval_added", data)
+
+        if completed:
+            await publish_approval_event(business_id, "status_changed", data)
+
+        return transaction
+
+    async def stream_transactions(
+        self,
+        business_id: uuid.UUID,
+        start_date: datetime,
+        end_date: datetime,
+        chunk_size: int,
+    ) -> AsyncGenerator[list, None]:
+        statement = (
+            select(*[getattr(Transaction, column) for column in EXPORT_COLUMNS])
+            .where(
+                Transaction.business_id == business_id,
+                Transaction.created_at >= start_date,
+                Transaction.created_at < end_date,
+            )
+            .order_by(Transaction.created_at, Transaction.id)
+            .execution_options(yield_per=chunk_size)
+        )
+
+        # the export outlives the request scoped session, so it owns its own
+        async with shard_router.session(business_id) as session:
+            result = await session.stream(statement)
+
+            async for rows in result.partitions(chunk_size):
+                yield rows
+
+    async def export_transactions(
+        self,
+        business_id: uuid.UUID,
+        start_date: datetime,
+        end_date: datetime,
+        format: str,
+        chunk_size: int,
+    ) -> AsyncGenerator[bytes, None]:
+        encoder = ENCODERS[format]()
+        started = time.perf_counter()
+        total_rows = 0
+
+        try:
+            yield encoder.header()
+
+            async for rows in self.stream_transactions(
+                business_id, start_date, end_date, chunk_size
+            ):
+                total_rows += len(rows)
+                yield encoder.encode(rows)
+
+            yield encoder.close()
+        finally:
+            elapsed = time.perf_counter() - started
+            logger.info(
+                "transaction export business=%s format=%s rows=%d elapsed=%.3fs rows_per_second=%.0f",
+                business_id,
+                format,
+                total_rows,
+                elapsed,
+                total_rows / elapsed if elapsed else 0,
+            )
+
+
+def approval_event_data(transaction: Transaction, approvals: int) -> dict:
+    return {
+        "transaction_id": transaction.id,
+        "status": transaction.status,
+        "transaction_type": transaction.transaction_type,
+        "amount": transaction.amount,
+        "approvals": approvals,
+        "required_approvals": transaction.number_of_required_approval,
+    }
@@ -0,0 +1,124 @@
+"""Production entry point: ``python -m src.server``.
+
+Runs the app under gunicorn with uvicorn workers on uvloop and httptools,
+sized and tuned from the SERVER_* settings.
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+from gunicorn.app.base import BaseApplication
+from uvicorn.workers import UvicornWorker
+
+from src.config.settings import Config
+
+
+class UvloopWorker(UvicornWorker):
+    CONFIG_KWARGS = {
+        "loop": "uvloop",
+        "http": "httptools",
+        "lifespan": "on",
+        # the app writes its own access log, see AccessLogMiddleware
+        "access_log": False,
+        # trusted for peers listed in forwarded_allow_ips only
+        "proxy_headers": True,
+    }
+
+
+def available_cpus() -> int:
+    """CPUs this process may use, honouring affinity and a cgroup v2 quota.
+
+    os.cpu_count() reports the host, which in a container can be many times
+    the share the container actually gets.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+
+        if quota != "max":
+            cpus = min(cpus, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+
+    return cpus
+
+
+def default_workers() -> int:
+    # every worker opens its own database pools and background loops
+    return max(1, min(available_cpus(), Config.SERVER_MAX_WORKERS))
+
+
+def child_exit(server, worker):
+    # drop the dead worker's live gauges from the aggregated /metrics
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def ensure_metrics_dir(workers: int):
+    """Re-exec with a fresh PROMETHEUS_MULTIPROC_DIR when running several workers.
+
+    prometheus_client picks its storage when it is imported, and running
+    this module has already imported the app through the src package, so
+    the variable only takes effect in a new process.
+    """
+    if workers < 2 or "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        return
+
+    path = os.path.join(tempfile.gettempdir(), f"corpman-metrics-{os.getpid()}")
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = path
+    os.execv(sys.executable, [sys.executable, "-m", "src.server", *sys.argv[1:]])
+
+
+class Server(BaseApplication):
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from src import app
+
+        return app
+
+
+def server_options() -> dict:
+    return {
+        "bind": f"{Config.SERVER_HOST}:{Config.SERVER_PORT}",
+        "workers": Config.SERVER_WORKERS or default_workers(),
+        "worker_class": "src.server.UvloopWorker",
+        "backlog": Config.SERVER_BACKLOG,
+        "keepalive": Config.SERVER_KEEPALIVE,
+        # client IPs for rate limits and login events come from the proxy
+        "forwarded_allow_ips": Config.FORWARDED_ALLOW_IPS,
+        "max_requests": Config.SERVER_MAX_REQUESTS,
+        "max_requests_jitter": Config.SERVER_MAX_REQUESTS_JITTER,
+        "timeout": Config.SERVER_TIMEOUT,
+        "graceful_timeout": Config.SERVER_GRACEFUL_TIMEOUT,
+        # imported once in the master so workers share its pages copy-on-write
+        "preload_app": Config.SERVER_PRELOAD,
+        "child_exit": child_exit,
+        "accesslog": None,
+    }
+
+
+def main():
+    options = server_options()
+    ensure_metrics_dir(options["workers"])
+    Server(options).run()
+
+
+if __name__ == "__main__":
+    main()
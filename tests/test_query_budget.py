@@ -0,0 +1,95 @@
+"""Tests for the src.common.query_budget pytest plugin.
+
+Finished requests are fed straight to the observers the plugin registers,
+the way QueryStatsMiddleware does, so no database is needed.
+"""
+import pytest
+
+pytest_plugins = ["pytester"]
+
+FINISH_REQUEST = """
+import pytest
+
+from src.config.db import QueryStats, query_stats_observers
+
+
+def finish_request(route, statements):
+    stats = QueryStats()
+
+    for statement in statements:
+        stats.record(statement, 0.001)
+
+    for observer in query_stats_observers:
+        observer("GET", route, stats)
+"""
+
+
+@pytest.fixture
+def run(pytester):
+    def run(body: str):
+        pytester.makepyfile(FINISH_REQUEST + body)
+        return pytester.runpytest_inprocess("-p", "src.common.query_budget")
+
+    return run
+
+
+def test_request_within_budget_passes(run):
+    result = run(
+        """
+@pytest.mark.query_budget(2)
+def test_route():
+    finish_request("/customers", ["SELECT 1", "SELECT 2"])
+"""
+    )
+
+    result.assert_outcomes(passed=1)
+
+
+def test_request_over_budget_fails(run):
+    result = run(
+        """
+@pytest.mark.query_budget(1)
+def test_route():
+    finish_request("/customers", ["SELECT 1", "SELECT 2"])
+"""
+    )
+
+    result.assert_outcomes(failed=1)
+    result.stdout.fnmatch_lines(["*GET /customers: 2 queries (budget 1)*"])
+
+
+def test_dict_budget_only_checks_listed_routes(run):
+    result = run(
+        """
+@pytest.mark.query_budget({"/customers": 1})
+def test_route():
+    finish_request("/customers", ["SELECT 1"])
+    finish_request("/transactions", ["SELECT 1", "SELECT 2", "SELECT 3"])
+"""
+    )
+
+    result.assert_outcomes(passed=1)
+
+
+def test_repeated_statements_are_reported(run):
+    result = run(
+        """
+@pytest.mark.query_budget(1)
+def test_route():
+    finish_request("/customers", ["SELECT wallet"] * 12)
+"""
+    )
+
+    result.assert_outcomes(failed=1)
+    result.stdout.fnmatch_lines(["*repeated: SELECT wallet*"])
+
+
+def test_unmarked_tests_are_not_checked(run):
+    result = run(
+        """
+def test_route():
+    finish_request("/customers", ["SELECT 1"] * 50)
+"""
+    )
+
+    result.assert_outcomes(passed=1)